@@ -3,6 +3,10 @@ import os
 import asyncio
 import random
 import json
+import queue
+import hashlib
+import logging
+import logging.handlers
 
 import discord
 from discord import app_commands
@@ -10,7 +14,7 @@ from discord.ext import commands
 from dotenv import load_dotenv
 
 from src.utils.utils import is_admin_or_manager
-from src.api.engauge_adapter import EngaugeAdapter
+from src.api.engauge_adapter import EngaugeAdapter, close_shared_session
 
 # ================= Env & config ==================
 load_dotenv()
@@ -24,11 +28,34 @@ if not os.getenv("ENGAUGE_API_TOKEN"):
     print("⚠️  ENGAUGE_API_TOKEN is not set. The predictions extension may fail to load until you set it.")
 
 DEV_GUILD_ID = os.getenv("DISCORD_GUILD_ID")  # your guild for fast propagation
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", ".command_sync_hash")  # last globally-synced command tree
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+log = logging.getLogger("bot")
+
+# ================= Logging ==================
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route all log records through a queue; a listener thread does the stderr writes off the event loop."""
+    q = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(q, stream, respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(logging.handlers.QueueHandler(q))
+    listener.start()
+    return listener
 
 # ================= Discord bot ==================
 intents = discord.Intents.default()
 intents.members = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+class SheetsBot(commands.Bot):
+    async def close(self):
+        # Cogs unload first (they may still talk to Engauge), then drop the shared pool
+        await super().close()
+        await close_shared_session()
+
+bot = SheetsBot(command_prefix="!", intents=intents)
 tree = bot.tree
 
 # ================= Crate Drop System =================
@@ -176,6 +203,26 @@ async def setup_hook():
     except Exception as e:
         print(f"Failed to start crate drop task: {e}")
 
+# ================= Command tree hashing =================
+def command_tree_hash() -> str:
+    """Stable hash of the global command tree, taken over the exact payload tree.sync() would send."""
+    payload = sorted((c.to_dict(tree) for c in tree.get_commands()), key=lambda d: (d.get("type", 1), d["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def read_synced_hash():
+    try:
+        with open(COMMAND_HASH_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def write_synced_hash(value: str):
+    try:
+        with open(COMMAND_HASH_FILE, "w", encoding="utf-8") as f:
+            f.write(value)
+    except OSError as e:
+        print(f"Could not persist command hash: {e}")
+
 # ================= Ready & initial sync =================
 @bot.event
 async def on_ready():
@@ -190,9 +237,14 @@ async def on_ready():
 
         # Sync once per process — DO NOT clear/copy; just sync
         if not getattr(bot, "_did_initial_sync", False):
-            # Always sync globally first
-            global_synced = await bot.tree.sync()
-            print(f"Global sync → {len(global_synced)} commands: {[c.name for c in global_synced]}")
+            # Global sync only when the command tree changed since the last one
+            current_hash = command_tree_hash()
+            if read_synced_hash() != current_hash:
+                global_synced = await bot.tree.sync()
+                write_synced_hash(current_hash)
+                print(f"Global sync → {len(global_synced)} commands: {[c.name for c in global_synced]}")
+            else:
+                print("Global commands unchanged — skipping global sync")
             
             # If DEV_GUILD_ID is set, also sync to the specific guild
             if DEV_GUILD_ID:
@@ -225,6 +277,7 @@ async def sync_commands(interaction: discord.Interaction):
     try:
         # Always sync globally first
         global_synced = await bot.tree.sync()
+        write_synced_hash(command_tree_hash())
         global_names = [c.name for c in global_synced]
         print(f"Global sync → {len(global_synced)} commands: {global_names}")
         
@@ -255,18 +308,20 @@ async def ping(interaction: discord.Interaction):
 # ================= Global app command error logger =================
 @tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    data = getattr(interaction, "data", None)
     try:
-        print(f"AppCommandError: {type(error).__name__}: {error}")
-        data = getattr(interaction, "data", None)
-        try:
-            print("Interaction data:")
-            print(json.dumps(data, indent=2))
-        except Exception:
-            print("Interaction data (raw):", data)
-    except Exception as log_e:
-        print("Failed to log app command error:", log_e)
+        data = json.dumps(data, indent=2)
+    except Exception:
+        pass
+    log.error("AppCommandError: %s: %s\nInteraction data:\n%s", type(error).__name__, error, data,
+              exc_info=error)
 
 # ================= Run =================
 if __name__ == "__main__":
     # Railway: python -u bot.py
-    bot.run(DISCORD_BOT_TOKEN)
+    listener = setup_logging()
+    try:
+        # log_handler=None: discord.py logs flow through the queued root handler above
+        bot.run(DISCORD_BOT_TOKEN, log_handler=None)
+    finally:
+        listener.stop()
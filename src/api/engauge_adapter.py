@@ -1,13 +1,95 @@
 import os
+import time
 import random
 import json
+import asyncio
 import aiohttp
 
+from src.api.http_metrics import trace_configs
+
+# Client-side pacing per server so bursts queue locally instead of bouncing off 429s
+ENGAUGE_RATE_PER_SEC = float(os.getenv("ENGAUGE_RATE_PER_SEC", "5"))
+ENGAUGE_BURST = int(os.getenv("ENGAUGE_BURST", "10"))
+
+ENGAUGE_ORIGIN = "https://engau.ge"
+ENGAUGE_POOL_LIMIT = int(os.getenv("ENGAUGE_POOL_LIMIT", "32"))
+ENGAUGE_POOL_PER_HOST = int(os.getenv("ENGAUGE_POOL_PER_HOST", "16"))
+ENGAUGE_RETRIES = int(os.getenv("ENGAUGE_RETRIES", "3"))   # extra attempts on transient failures
+
+_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
 
 class InsufficientFunds(Exception):
     pass
 
 
+class _TokenBucket:
+    """Refills `rate` tokens/sec up to `capacity`; acquire() waits for one token."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "lock")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.updated = time.monotonic()
+            self.tokens -= 1
+
+
+# Shared across adapter instances (cogs build a fresh adapter per call)
+_buckets: dict[int, _TokenBucket] = {}
+
+
+async def engauge_throttle(server_id: int):
+    """Wait for this server's Engauge rate-limit slot."""
+    bucket = _buckets.get(server_id)
+    if bucket is None:
+        bucket = _buckets[server_id] = _TokenBucket(ENGAUGE_RATE_PER_SEC, ENGAUGE_BURST)
+    await bucket.acquire()
+
+
+# One keep-alive pool for every Engauge caller (adapters are built per call; the fun cog shares it too)
+_shared_session: aiohttp.ClientSession | None = None
+
+
+def shared_session() -> aiohttp.ClientSession:
+    """The process-wide engau.ge session; requests use paths relative to ENGAUGE_ORIGIN."""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            base_url=ENGAUGE_ORIGIN,
+            # Token-authenticated API: never store or replay Set-Cookie across callers
+            cookie_jar=aiohttp.DummyCookieJar(),
+            connector=aiohttp.TCPConnector(
+                limit=ENGAUGE_POOL_LIMIT,
+                limit_per_host=ENGAUGE_POOL_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            ),
+            trace_configs=trace_configs(),
+        )
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the shared Engauge session (call on bot shutdown)."""
+    global _shared_session
+    if _shared_session is not None:
+        await _shared_session.close()
+        _shared_session = None
+
+
 class EngaugeAdapter:
     """
     Engauge currency client.
@@ -15,17 +97,22 @@ class EngaugeAdapter:
     """
 
     def __init__(self, server_id: int):
-        self.base = "https://engau.ge/api/v1"
+        self.base = f"{ENGAUGE_ORIGIN}/api/v1"
         self.token = os.getenv("ENGAUGE_API_TOKEN") or os.getenv("ENGAUGE_TOKEN", "")
         self.server_id = int(server_id)
         if not self.token:
             raise RuntimeError("ENGAUGE_API_TOKEN or ENGAUGE_TOKEN must be set")
-
-    def _headers(self):
-        return {
+        # Static per adapter: build once instead of on every request
+        self._headers_dict = {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/json",
         }
+        # Paths are relative to the session's base_url, so aiohttp only parses the origin once
+        self._server_path = f"/api/v1/servers/{self.server_id}"
+        self._members_path = f"{self._server_path}/members/"
+
+    def _headers(self):
+        return self._headers_dict
 
     def _parse_crates_from_env(self) -> list[dict]:
         """
@@ -70,15 +157,45 @@ class EngaugeAdapter:
         
         return crates
 
+    async def _request(self, method: str, url: str, *, idempotent: bool, **kw):
+        """
+        Send one Engauge call and return its JSON body, retrying transient failures
+        with jittered exponential backoff (Retry-After wins when the server sends it).
+
+        Currency POSTs are deltas with no idempotency key, so they only retry when
+        the call provably didn't apply: a 429, or a connection that never opened.
+        """
+        for attempt in range(ENGAUGE_RETRIES + 1):
+            final = attempt == ENGAUGE_RETRIES
+            retry_after = None
+            await engauge_throttle(self.server_id)
+            try:
+                async with shared_session().request(method, url, headers=self._headers(), **kw) as r:
+                    if r.status == 402:
+                        raise InsufficientFunds("Insufficient balance")
+                    if final or r.status not in _RETRY_STATUSES or not (idempotent or r.status == 429):
+                        r.raise_for_status()
+                        return await r.json()
+                    retry_after = r.headers.get("Retry-After")
+            except aiohttp.ClientResponseError:
+                raise
+            except aiohttp.ClientConnectorError:
+                if final:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if final or not idempotent:
+                    raise
+            try:
+                delay = min(float(retry_after), 30.0)
+            except (TypeError, ValueError):
+                delay = min(8.0, 0.3 * 2 ** attempt) + random.random() * 0.2
+            await asyncio.sleep(delay)
+
     async def adjust(self, member_id: int, amount: int):
-        url = f"{self.base}/servers/{self.server_id}/members/{int(member_id)}/currency"
-        params = {"amount": str(int(amount))}
-        async with aiohttp.ClientSession() as s:
-            async with s.post(url, params=params, headers=self._headers()) as r:
-                if r.status == 402:
-                    raise InsufficientFunds("Insufficient balance")
-                r.raise_for_status()
-                return await r.json()
+        # Expects ints; debit/credit normalise the amount once
+        url = f"{self._members_path}{member_id}/currency"
+        params = {"amount": format(amount, "d")}
+        return await self._request("POST", url, idempotent=False, params=params)
 
     async def debit(self, member_id: int, amount: int):
         return await self.adjust(member_id, -abs(int(amount)))
@@ -88,13 +205,10 @@ class EngaugeAdapter:
 
     async def get_balance(self, member_id: int) -> int:
         """Get the current balance for a member"""
-        url = f"{self.base}/servers/{self.server_id}/members/{int(member_id)}"
-        async with aiohttp.ClientSession() as s:
-            async with s.get(url, headers=self._headers()) as r:
-                r.raise_for_status()
-                data = await r.json()
-                # Return the currency field from the member stats
-                return int(data.get('currency', 0))
+        url = f"{self._members_path}{member_id}"
+        data = await self._request("GET", url, idempotent=True)
+        # Return the currency field from the member stats
+        return int(data.get('currency', 0))
 
     async def drop_crate(self) -> dict:
         """
@@ -127,46 +241,46 @@ class EngaugeAdapter:
         crate_id = selected_crate['id']
         
         # Call the Engauge API to drop the crate
-        url = f"{self.base}/servers/{self.server_id}/crates/{crate_id}/drop"
-        async with aiohttp.ClientSession() as s:
-            async with s.post(url, headers=self._headers()) as r:
-                print(f"Crate drop response: {r.status}")
-                # Handle 500 responses gracefully - sometimes the API returns 500 even on successful drops
-                if r.status == 500:
-                    # Return a success response indicating the drop was attempted
-                    # Try to get response content, but don't fail if it's not JSON
-                    try:
-                        response_content = await r.json()
-                    except Exception:
-                        # If JSON parsing fails, get text content instead
-                        response_content = await r.text()
+        url = f"{self._server_path}/crates/{crate_id}/drop"
+        await engauge_throttle(self.server_id)
+        async with shared_session().post(url, headers=self._headers()) as r:
+            print(f"Crate drop response: {r.status}")
+            # Handle 500 responses gracefully - sometimes the API returns 500 even on successful drops
+            if r.status == 500:
+                # Return a success response indicating the drop was attempted
+                # Try to get response content, but don't fail if it's not JSON
+                try:
+                    response_content = await r.json()
+                except Exception:
+                    # If JSON parsing fails, get text content instead
+                    response_content = await r.text()
                     
+                return {
+                    "success": True,
+                    "message": "Crate drop attempted (API returned 500 but operation may have succeeded)",
+                    "response": response_content,
+                    "crate_id": crate_id,
+                    "status_code": 500
+                }
+            elif r.status >= 400:
+                # For other error status codes, raise an exception
+                raise aiohttp.ClientResponseError(
+                    request_info=r.request_info,
+                    history=r.history,
+                    status=r.status,
+                    message=f"HTTP {r.status} error"
+                )
+            else:
+                # For successful responses, try to parse JSON, but handle parsing errors gracefully
+                try:
+                    return await r.json()
+                except Exception as json_error:
+                    # If JSON parsing fails, return a success response with the raw content
+                    text_content = await r.text()
                     return {
                         "success": True,
-                        "message": "Crate drop attempted (API returned 500 but operation may have succeeded)",
-                        "response": response_content,
+                        "message": f"Response received but JSON parsing failed: {json_error}",
+                        "raw_content": text_content[:200] if text_content else "No content",
                         "crate_id": crate_id,
-                        "status_code": 500
+                        "status_code": r.status
                     }
-                elif r.status >= 400:
-                    # For other error status codes, raise an exception
-                    raise aiohttp.ClientResponseError(
-                        request_info=r.request_info,
-                        history=r.history,
-                        status=r.status,
-                        message=f"HTTP {r.status} error"
-                    )
-                else:
-                    # For successful responses, try to parse JSON, but handle parsing errors gracefully
-                    try:
-                        return await r.json()
-                    except Exception as json_error:
-                        # If JSON parsing fails, return a success response with the raw content
-                        text_content = await r.text()
-                        return {
-                            "success": True,
-                            "message": f"Response received but JSON parsing failed: {json_error}",
-                            "raw_content": text_content[:200] if text_content else "No content",
-                            "crate_id": crate_id,
-                            "status_code": r.status
-                        }
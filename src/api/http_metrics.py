@@ -0,0 +1,76 @@
+"""
+Opt-in aiohttp timing traces (set HTTP_TRACE=1).
+
+Logs per-request DNS, connect and total time to the "http.metrics" logger,
+plus whether a pooled connection was reused, so keep-alive/pool changes can
+be checked against real numbers.
+"""
+
+import os
+import time
+import logging
+from types import SimpleNamespace
+
+import aiohttp
+
+HTTP_TRACE = os.getenv("HTTP_TRACE", "").lower() in ("1", "true", "yes")
+
+log = logging.getLogger("http.metrics")
+
+
+async def _on_request_start(session, ctx: SimpleNamespace, params):
+    ctx.start = time.perf_counter()
+    ctx.dns = ctx.connect = None
+    ctx.reused = False
+
+
+async def _on_dns_start(session, ctx: SimpleNamespace, params):
+    ctx.dns_start = time.perf_counter()
+
+
+async def _on_dns_end(session, ctx: SimpleNamespace, params):
+    ctx.dns = time.perf_counter() - ctx.dns_start
+
+
+async def _on_conn_create_start(session, ctx: SimpleNamespace, params):
+    ctx.connect_start = time.perf_counter()
+
+
+async def _on_conn_create_end(session, ctx: SimpleNamespace, params):
+    ctx.connect = time.perf_counter() - ctx.connect_start
+
+
+async def _on_conn_reuse(session, ctx: SimpleNamespace, params):
+    ctx.reused = True
+
+
+async def _on_request_end(session, ctx: SimpleNamespace, params):
+    total = time.perf_counter() - ctx.start
+    log.info(
+        "%s %s status=%s total=%.1fms dns=%s connect=%s reused=%s",
+        params.method, params.url.host, params.response.status, total * 1000,
+        f"{ctx.dns * 1000:.1f}ms" if ctx.dns is not None else "-",
+        f"{ctx.connect * 1000:.1f}ms" if ctx.connect is not None else "-",
+        ctx.reused,
+    )
+
+
+async def _on_request_exception(session, ctx: SimpleNamespace, params):
+    total = time.perf_counter() - ctx.start
+    log.info("%s %s failed after %.1fms: %r", params.method, params.url.host, total * 1000, params.exception)
+
+
+def trace_configs() -> list[aiohttp.TraceConfig]:
+    """trace_configs= value for ClientSession; empty unless HTTP_TRACE is set."""
+    if not HTTP_TRACE:
+        return []
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_dns_resolvehost_start.append(_on_dns_start)
+    trace.on_dns_resolvehost_end.append(_on_dns_end)
+    trace.on_connection_create_start.append(_on_conn_create_start)
+    trace.on_connection_create_end.append(_on_conn_create_end)
+    trace.on_connection_reuseconn.append(_on_conn_reuse)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    return [trace]
@@ -5,7 +5,7 @@ Base cog class with unified database functionality.
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import os
 from src.database.database import Database
 
@@ -115,11 +115,23 @@ class BaseCog(commands.Cog):
             raise RuntimeError("Database not initialized")
         return await self.db.deduct_cash(user_id, guild_id, amount, reason)
     
-    async def add_cash(self, user_id: int, guild_id: int, amount: int, reason: str = ""):
-        """Add cash to user's balance."""
+    async def try_deduct_cash(self, user_id: int, guild_id: int, amount: int, reason: str = "") -> Optional[int]:
+        """Deduct cash from user's balance. Returns the new cash balance, or None if they can't cover it."""
         if not self.db:
             raise RuntimeError("Database not initialized")
-        await self.db.add_cash(user_id, guild_id, amount, reason)
+        return await self.db.try_deduct_cash(user_id, guild_id, amount, reason)
+    
+    async def add_cash(self, user_id: int, guild_id: int, amount: int, reason: str = "") -> Optional[int]:
+        """Add cash to user's balance. Returns the new cash balance."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+        return await self.db.add_cash(user_id, guild_id, amount, reason)
+    
+    async def add_cash_many(self, guild_id: int, credits: List[Tuple[int, int]], reason: str = "") -> Dict[int, int]:
+        """Credit many (user_id, amount) pairs in one transaction. Returns {user_id: new cash}."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+        return await self.db.add_cash_many(guild_id, credits, reason)
     
     async def transfer_money(self, from_user_id: int, to_user_id: int, guild_id: int, 
                            amount: int, reason: str = "") -> bool:
@@ -1,13 +1,36 @@
 # CC to TC without DB 
 import os
 import re
+import asyncio
+import json
+import logging
+import time
+import uuid
+import random
 import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
 # Command groups removed - all commands are now flat
 from typing import Any, Optional, Dict
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from src.bot.base_cog import BaseCog
+from src.api.engauge_adapter import engauge_throttle, shared_session
+from src.api.http_metrics import trace_configs
+
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+log = logging.getLogger(__name__)
 
 # Emojis (set these in .env for custom server emojis)
 UNB_ICON = os.getenv("CURRENCY_EMOTE", "")      # UnbelievaBoat
@@ -15,10 +38,23 @@ ENG_ICON = os.getenv("CURRENCY_EMOJI", "")      # Engauge
 
 # Fixed conversion rate (override via .env EXCHANGE_RATE_UNB_PER_ENG)
 UNB_PER_ENG = int(os.getenv("EXCHANGE_RATE_UNB_PER_ENG", "125"))
+# Largest single exchange (in ENG) and resulting UNB credit accepted before any API call
+EXCHANGE_MAX_PER_TX = int(os.getenv("EXCHANGE_MAX_PER_TX", "1000000"))
+EXCHANGE_MAX_UNB_GAIN = int(os.getenv("EXCHANGE_MAX_UNB_GAIN", str(2**53 - 1)))
+
+# Shared HTTP session settings
+HTTP_TIMEOUT_SECONDS = float(os.getenv("FUN_HTTP_TIMEOUT", "20"))
+HTTP_USER_AGENT = os.getenv("FUN_HTTP_USER_AGENT", "Company-Sheets-Bot (discord.py)")
+
+# Engauge request timeout (the connection pool is the adapter's shared one)
+ENGAUGE_TIMEOUT_SECONDS = float(os.getenv("ENGAUGE_TIMEOUT", "10"))
 
 # API endpoints
 RABBIT_API_RANDOM = os.getenv("RABBIT_API_URL", "https://rabbit-api-two.vercel.app/api/random")
 DOG_API_RANDOM = os.getenv("DOG_API_URL", "https://dog.ceo/api/breeds/image/random")
+HEDGE_DELAY_SECONDS = float(os.getenv("FUN_HEDGE_DELAY", "1.5"))  # fire a backup GET if the first is this slow
+DOG_BATCH_SIZE = int(os.getenv("DOG_BATCH_SIZE", "50"))          # URLs fetched per dog.ceo call
+DOG_CACHE_TTL = float(os.getenv("DOG_CACHE_TTL", "3600"))         # seconds before a batch goes stale
 CAT_API_RANDOM = "https://api.thecatapi.com/v1/images/search"
 CAT_API_KEY = os.getenv("CAT_API_KEY", "")
 # ============================ Exceptions ============================
@@ -29,29 +65,31 @@ class InsufficientFunds(ProviderError): ...
 class Engauge:
     """Server-scoped Engauge currency adjuster (POST amount delta)."""
     def __init__(self):
-        self.base = "https://engau.ge/api/v1"
         self.token = os.getenv("ENGAUGE_API_TOKEN") or os.getenv("ENGAUGE_TOKEN", "")
         if not self.token:
             raise RuntimeError("Set ENGAUGE_API_TOKEN or ENGAUGE_TOKEN")
-
-    def _headers(self):
-        return {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
-
-    async def adjust(self, guild_id: int, user_id: int, amount: int):
-        url = f"{self.base}/servers/{int(guild_id)}/members/{int(user_id)}/currency"
-        params = {"amount": str(int(amount))}
-        async with aiohttp.ClientSession() as s:
-            async with s.post(url, params=params, headers=self._headers()) as r:
-                if r.status == 402:
-                    raise InsufficientFunds("Insufficient Engauge balance")
-                if r.status >= 400:
-                    raise ProviderError(f"Engauge HTTP {r.status}: {await r.text()}")
-
-    async def debit(self, guild_id: int, user_id: int, amount: int):
-        await self.adjust(guild_id, user_id, -abs(int(amount)))
-
-    async def credit(self, guild_id: int, user_id: int, amount: int):
-        await self.adjust(guild_id, user_id, abs(int(amount)))
+        self._currency_path = "/api/v1/servers/{}/members/{}/currency"
+        self._headers = {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
+        self._timeout = aiohttp.ClientTimeout(total=ENGAUGE_TIMEOUT_SECONDS)
+
+    async def adjust(self, guild_id: int, user_id: int, amount: int, idem_key: Optional[str] = None):
+        # Expects ints; debit/credit normalise the amount once
+        path = self._currency_path.format(guild_id, user_id)
+        params = {"amount": format(amount, "d")}
+        headers = {**self._headers, "X-Idempotency-Key": idem_key} if idem_key else self._headers
+        await engauge_throttle(guild_id)
+        # Same engau.ge pool as EngaugeAdapter; bot shutdown closes it via close_shared_session()
+        async with shared_session().post(path, params=params, headers=headers, timeout=self._timeout) as r:
+            if r.status == 402:
+                raise InsufficientFunds("Insufficient Engauge balance")
+            if r.status >= 400:
+                raise ProviderError(f"Engauge HTTP {r.status}: {await r.text()}")
+
+    async def debit(self, guild_id: int, user_id: int, amount: int, idem_key: Optional[str] = None):
+        await self.adjust(guild_id, user_id, -abs(int(amount)), idem_key)
+
+    async def credit(self, guild_id: int, user_id: int, amount: int, idem_key: Optional[str] = None):
+        await self.adjust(guild_id, user_id, abs(int(amount)), idem_key)
 
 # COMMENTED OUT - Using unified database system instead of Unbelievaboat API
 # class UnbelievaBoat:
@@ -114,11 +152,23 @@ class BuyUnbModal(discord.ui.Modal, title="Buy TC"):
         except Exception:
             return await interaction.response.send_message("Enter a positive integer.", ephemeral=True)
 
+        if eng_amt > EXCHANGE_MAX_PER_TX:
+            return await interaction.response.send_message(
+                f"Max per exchange is **{EXCHANGE_MAX_PER_TX:,}** {ENG_ICON}.", ephemeral=True
+            )
+
         unb_gain = eng_amt * self.rate
+        if unb_gain > EXCHANGE_MAX_UNB_GAIN:
+            return await interaction.response.send_message(
+                "That exchange is too large to credit. Try a smaller amount.", ephemeral=True
+            )
+        # One id per exchange, tagged onto each leg (debit, credit, refund) and the
+        # refund-failure log, so a half-finished exchange can be reconciled by hand
+        idem_id = uuid.uuid4().hex
 
         # Debit Engauge → then credit UNB; refund on UNB failure
         try:
-            await self.cog._eng.debit(self.inter.guild_id, self.inter.user.id, eng_amt)
+            await self.cog._eng.debit(self.inter.guild_id, self.inter.user.id, eng_amt, f"{idem_id}:debit")
         except InsufficientFunds:
             return await interaction.response.send_message(
                 f"You don't have enough {ENG_ICON} to spend **{eng_amt:,}**.",
@@ -132,14 +182,15 @@ class BuyUnbModal(discord.ui.Modal, title="Buy TC"):
                 self.inter.guild_id,
                 self.inter.user.id,
                 unb_gain,
-                reason=f"Exchange {eng_amt} {ENG_ICON} → {unb_gain} {UNB_ICON} at {self.rate}/1"
+                reason=f"Exchange {eng_amt} {ENG_ICON} → {unb_gain} {UNB_ICON} at {self.rate}/1 [{idem_id}]"
             )
         except Exception as e:
             # Refund Engauge on failure
             try:
-                await self.cog._eng.credit(self.inter.guild_id, self.inter.user.id, eng_amt)
-            except Exception as e2:
-                print("Refund failed after UNB error:", e2)
+                await self.cog._eng.credit(self.inter.guild_id, self.inter.user.id, eng_amt, f"{idem_id}:refund")
+            except Exception:
+                log.exception("Refund failed after UNB error (exchange %s, user %s, %s)",
+                              idem_id, self.inter.user.id, eng_amt)
             return await interaction.response.send_message(
                 f"UnbelievaBoat error: {e}. Refunded your {ENG_ICON}.",
                 ephemeral=True
@@ -155,6 +206,26 @@ class BuyUnbModal(discord.ui.Modal, title="Buy TC"):
 class Fun(BaseCog):
     def __init__(self, bot: commands.Bot):
         super().__init__(bot)
+        # One keep-alive session for the cog's lifetime (created in cog_load)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # (fetched_at, urls) — dog.ceo batch, drained one URL per /dog
+        self._dog_candidates: tuple[float, list[str]] = (0.0, [])
+        # Single-flight refill: concurrent /dog calls on a miss share one fetch task
+        self._dog_inflight: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        await super().cog_load()
+        self._session = aiohttp.ClientSession(
+            headers={"User-Agent": HTTP_USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS),
+            json_serialize=_json_dumps,
+            trace_configs=trace_configs(),
+        )
+
+    async def cog_unload(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     @staticmethod
     def _extract_bunny_image_url(payload: Any) -> Optional[str]:
@@ -209,6 +280,73 @@ class Fun(BaseCog):
                 return url
         return ""
 
+    async def _next_dog_url(self) -> str:
+        """
+        Pop one URL from the cached dog.ceo batch, refetching when it's empty or stale.
+        dog.ceo serves N random images per call via /random/{N}: { "message": [<url>, ...] }
+        """
+        fetched_at, urls = self._dog_candidates
+        if not urls or time.monotonic() - fetched_at >= DOG_CACHE_TTL:
+            task = self._dog_inflight
+            if task is None:
+                # The fetch runs as its own task, so a caller that gets cancelled
+                # only stops waiting; everyone else still gets the batch
+                task = self._dog_inflight = asyncio.create_task(self._refill_dog_batch())
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())  # mark retrieved
+            urls = await asyncio.shield(task)
+        return urls.pop() if urls else ""
+
+    async def _refill_dog_batch(self) -> list[str]:
+        try:
+            urls = await self._fetch_dog_batch()
+            self._dog_candidates = (time.monotonic(), urls)
+            return urls
+        finally:
+            self._dog_inflight = None
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential_jitter(initial=0.2, max=2.0),
+        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+        reraise=True,
+    )
+    async def _get_json(self, url: str, **kwargs) -> Any:
+        """GET + decode JSON. Transport errors retry with jittered backoff; non-200 replies don't."""
+        async with self._session.get(url, timeout=15, **kwargs) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"API returned HTTP {resp.status}")
+            return _json_loads(await resp.read())
+
+    async def _hedged_get_json(self, url: str, **kwargs) -> Any:
+        """
+        _get_json, but if it hasn't answered within HEDGE_DELAY_SECONDS a second
+        identical GET is raced against it; first success wins, the loser is cancelled.
+        """
+        pending = {asyncio.create_task(self._get_json(url, **kwargs))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=HEDGE_DELAY_SECONDS)
+            if done:
+                return done.pop().result()
+
+            pending.add(asyncio.create_task(self._get_json(url, **kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both attempts failed: surface the last error
+            return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_dog_batch(self) -> list[str]:
+        data: Dict[str, Any] = await self._get_json(f"{DOG_API_RANDOM}/{DOG_BATCH_SIZE}")
+        msg = data.get("message") if isinstance(data, dict) else None
+        urls = [u for u in msg if isinstance(u, str) and u.startswith("http")] if isinstance(msg, list) else []
+        random.shuffle(urls)
+        return urls
+
     @staticmethod
     def _extract_cat_image_url(payload: Any) -> Optional[str]:
         """
@@ -229,13 +367,7 @@ class Fun(BaseCog):
         await interaction.response.defer(thinking=True)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(DOG_API_RANDOM, timeout=15) as resp:
-                    if resp.status != 200:
-                        raise RuntimeError(f"API returned HTTP {resp.status}")
-                    data: Dict[str, Any] = await resp.json()
-
-            img_url = self._extract_dog_image_url(data)
+            img_url = await self._next_dog_url()
             if not img_url:
                 raise RuntimeError("Couldn't find an image URL in the API response.")
 
@@ -249,6 +381,7 @@ class Fun(BaseCog):
             await interaction.followup.send(embed=embed)
 
         except Exception:
+            log.warning("/dog failed", exc_info=True)
             await interaction.followup.send(
                 "Couldn't fetch a dog right now. Try again in a moment 🐕",
                 ephemeral=True
@@ -261,11 +394,7 @@ class Fun(BaseCog):
         await interaction.response.defer(thinking=True)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(RABBIT_API_RANDOM, timeout=15) as resp:
-                    if resp.status != 200:
-                        raise RuntimeError(f"API returned HTTP {resp.status}")
-                    data: Dict[str, Any] = await resp.json(content_type=None)
+            data: Dict[str, Any] = await self._hedged_get_json(RABBIT_API_RANDOM)
 
             img_url = self._extract_bunny_image_url(data)
             if not img_url:
@@ -280,7 +409,8 @@ class Fun(BaseCog):
 
             await interaction.followup.send(embed=embed)
 
-        except Exception as e:
+        except Exception:
+            log.warning("/bunny failed", exc_info=True)
             # Keep errors out of chat; give a clean message instead.
             await interaction.followup.send(
                 "Couldn't fetch a bunny right now. Try again in a moment 🐇",
@@ -297,11 +427,7 @@ class Fun(BaseCog):
             if CAT_API_KEY:
                 headers["x-api-key"] = CAT_API_KEY
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(CAT_API_RANDOM, headers=headers, timeout=15) as resp:
-                    if resp.status != 200:
-                        raise RuntimeError(f"API returned HTTP {resp.status}")
-                    data: Dict[str, Any] = await resp.json()
+            data: Dict[str, Any] = await self._hedged_get_json(CAT_API_RANDOM, headers=headers)
 
             img_url = self._extract_cat_image_url(data)
             if not img_url:
@@ -317,6 +443,7 @@ class Fun(BaseCog):
             await interaction.followup.send(embed=embed)
 
         except Exception:
+            log.warning("/cat failed", exc_info=True)
             await interaction.followup.send(
                 "Couldn't fetch a cat right now. Try again in a moment 🐈",
                 ephemeral=True
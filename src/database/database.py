@@ -4,6 +4,7 @@ PostgreSQL-compatible version.
 """
 
 import os
+import time
 import asyncio
 import asyncpg
 from datetime import datetime, timedelta
@@ -29,6 +30,9 @@ POSTGRES_CONFIG = {
     "command_timeout": 60
 }
 
+# Guild settings are read by nearly every economy command but only change by hand in the DB
+GUILD_SETTINGS_TTL = float(os.getenv("GUILD_SETTINGS_TTL", "60"))  # seconds
+
 # Default economy settings
 DEFAULT_SETTINGS = {
     "currency_symbol": TC_EMOJI,
@@ -59,6 +63,7 @@ class Database:
         self._lock = asyncio.Lock()
         self._initialized = False
         self._pool: Optional[asyncpg.Pool] = None
+        self._settings_cache: Dict[int, Tuple[float, GuildSettings]] = {}  # guild_id -> (fetched_at, settings)
     
     async def init_database(self):
         """Initialize the unified database with all required tables."""
@@ -650,7 +655,7 @@ class Database:
                                 last_crime: Optional[datetime] = None,
                                 last_rob: Optional[datetime] = None,
                                 last_collect: Optional[datetime] = None):
-        """Update user's balance and stats."""
+        """Update user's balance and stats. Returns the new cash balance (None if nothing changed)."""
         try:
             await self.ensure_initialized()
             async with self._pool.acquire() as conn:
@@ -729,10 +734,10 @@ class Database:
                 
                 if updates:
                     updates.append("updated_at = (NOW() AT TIME ZONE 'America/New_York')")
-                    query = f"UPDATE user_balances SET {', '.join(updates)} WHERE user_id = ${param_count} AND guild_id = ${param_count + 1}"
+                    query = f"UPDATE user_balances SET {', '.join(updates)} WHERE user_id = ${param_count} AND guild_id = ${param_count + 1} RETURNING cash"
                     params.extend([user_id, guild_id])
                     
-                    await conn.execute(query, *params)
+                    return await conn.fetchval(query, *params)
         except Exception as e:
             print(f"update_user_balance error: {e!r}")
             raise
@@ -749,7 +754,16 @@ class Database:
             """, user_id, guild_id, amount, transaction_type, target_user_id, success, reason)
     
     async def get_guild_settings(self, guild_id: int) -> GuildSettings:
-        """Get guild economy settings."""
+        """Get guild economy settings (cached for GUILD_SETTINGS_TTL seconds)."""
+        hit = self._settings_cache.get(guild_id)
+        now = time.monotonic()
+        if hit is not None and now - hit[0] < GUILD_SETTINGS_TTL:
+            return hit[1]
+        settings = await self._fetch_guild_settings(guild_id)
+        self._settings_cache[guild_id] = (now, settings)
+        return settings
+    
+    async def _fetch_guild_settings(self, guild_id: int) -> GuildSettings:
         await self.ensure_initialized()
         async with self._pool.acquire() as conn:
             row = await conn.fetchrow("""
@@ -824,27 +838,36 @@ class Database:
     
     async def deduct_cash(self, user_id: int, guild_id: int, amount: int, reason: str = "") -> bool:
         """Deduct cash from user's balance. Returns True if successful."""
-        
-        if not await self.check_balance(user_id, guild_id, amount):
-            return False
-        
-        await self.update_user_balance(
-            user_id, guild_id,
-            cash_delta=-amount,
-            total_spent_delta=amount
-        )
+        return await self.try_deduct_cash(user_id, guild_id, amount, reason) is not None
+    
+    async def try_deduct_cash(self, user_id: int, guild_id: int, amount: int, reason: str = "") -> Optional[int]:
+        """Deduct cash from user's balance. Returns the new cash balance, or None if they can't cover it."""
+        await self.ensure_initialized()
+        # Check and deduct in one statement: the row lock makes concurrent bets from the
+        # same user serialize here instead of both passing a separate balance check
+        async with self._pool.acquire() as conn:
+            cash = await conn.fetchval("""
+                UPDATE user_balances
+                SET cash = cash - $1,
+                    total_spent = total_spent + $1,
+                    updated_at = (NOW() AT TIME ZONE 'America/New_York')
+                WHERE user_id = $2 AND guild_id = $3 AND cash >= $1
+                RETURNING cash
+            """, amount, user_id, guild_id)
+        if cash is None:
+            return None
         
         await self.log_transaction(
             user_id, guild_id, -amount, "game_deduct", 
             success=True, reason=reason
         )
-        return True
+        return cash
     
-    async def add_cash(self, user_id: int, guild_id: int, amount: int, reason: str = ""):
-        """Add cash to user's balance."""
+    async def add_cash(self, user_id: int, guild_id: int, amount: int, reason: str = "") -> Optional[int]:
+        """Add cash to user's balance. Returns the new cash balance."""
         try:
             await self.ensure_initialized()
-            await self.update_user_balance(
+            cash = await self.update_user_balance(
                 user_id, guild_id,
                 cash_delta=amount,
                 total_earned_delta=amount
@@ -854,10 +877,43 @@ class Database:
                 user_id, guild_id, amount, "game_win", 
                 success=True, reason=reason
             )
+            return cash
         except Exception as e:
             print(f"add_cash error: {e!r}")
             raise
     
+    async def add_cash_many(self, guild_id: int, credits: List[Tuple[int, int]], reason: str = "") -> Dict[int, int]:
+        """Credit many (user_id, amount) pairs in one transaction. Returns {user_id: new cash}."""
+        if not credits:
+            return {}
+        await self.ensure_initialized()
+        user_ids = [u for u, _ in credits]
+        amounts = [a for _, a in credits]
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    INSERT INTO user_balances (user_id, guild_id)
+                    SELECT DISTINCT u, $2 FROM unnest($1::bigint[]) AS u
+                    ON CONFLICT (user_id, guild_id) DO NOTHING
+                """, user_ids, guild_id)
+                rows = await conn.fetch("""
+                    UPDATE user_balances b
+                    SET cash = b.cash + c.amount,
+                        total_earned = b.total_earned + c.amount,
+                        updated_at = (NOW() AT TIME ZONE 'America/New_York')
+                    FROM (SELECT user_id, SUM(amount)::bigint AS amount
+                          FROM unnest($1::bigint[], $2::bigint[]) AS t(user_id, amount)
+                          GROUP BY user_id) c
+                    WHERE b.user_id = c.user_id AND b.guild_id = $3
+                    RETURNING b.user_id, b.cash
+                """, user_ids, amounts, guild_id)
+                await conn.executemany("""
+                    INSERT INTO transactions 
+                    (user_id, guild_id, amount, transaction_type, target_user_id, success, reason)
+                    VALUES ($1, $2, $3, 'game_win', NULL, TRUE, $4)
+                """, [(u, guild_id, a, reason) for u, a in credits])
+        return {row["user_id"]: row["cash"] for row in rows}
+    
     async def transfer_money(self, from_user_id: int, to_user_id: int, guild_id: int, 
                            amount: int, reason: str = "") -> bool:
         """Transfer money between users. Returns True if successful."""
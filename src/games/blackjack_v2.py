@@ -1,6 +1,6 @@
 #
 #  src/games/blackjack.py
-import os, random, math, asyncio, tempfile, io
+import os, random, math, asyncio, io
 from typing import List, Tuple, Dict, Optional
 
 import discord
@@ -169,43 +169,36 @@ class BlackjackV2(BaseCog):
     def create_card_files(self, st: Dict, *, reveal: bool) -> List[discord.File]:
         """Create rendered card images as Discord files using render_hand"""
         files: List[discord.File] = []
-        
-        # Create temporary files for the rendered images
-        with tempfile.TemporaryDirectory() as temp_dir:
-            dealer_path = os.path.join(temp_dir, "dealer.png")
-            player_path = os.path.join(temp_dir, "player.png")
-            
-            # Dealer cards
-            dealer_card_paths = [card_png(r, s) for (r, s) in st["dealer"]]
-            render_hand(
-                dealer_card_paths,
-                dealer_path,
-                show_all=reveal,
-                back_path=back_png(),
-                angle_step=4,
-                overlap_px=45,
-                scale=0.2
-            )
-            # Read the file content into memory before the temp directory is cleaned up
-            with open(dealer_path, 'rb') as f:
-                dealer_data = f.read()
-            files.append(discord.File(io.BytesIO(dealer_data), filename="dealer.png"))
-            
-            # Player cards
-            player_card_paths = [card_png(r, s) for (r, s) in st["player"]]
-            render_hand(
-                player_card_paths,
-                player_path,
-                show_all=True,
-                angle_step=4,
-                overlap_px=45,
-                scale=0.2
-            )
-            # Read the file content into memory before the temp directory is cleaned up
-            with open(player_path, 'rb') as f:
-                player_data = f.read()
-            files.append(discord.File(io.BytesIO(player_data), filename="player.png"))
-        
+
+        # Render straight into in-memory buffers; discord.File reads them as-is
+        dealer_buf = io.BytesIO()
+        dealer_card_paths = [card_png(r, s) for (r, s) in st["dealer"]]
+        render_hand(
+            dealer_card_paths,
+            dealer_buf,
+            show_all=reveal,
+            back_path=back_png(),
+            angle_step=4,
+            overlap_px=45,
+            scale=0.2
+        )
+        dealer_buf.seek(0)
+        files.append(discord.File(dealer_buf, filename="dealer.png"))
+
+        # Player cards
+        player_buf = io.BytesIO()
+        player_card_paths = [card_png(r, s) for (r, s) in st["player"]]
+        render_hand(
+            player_card_paths,
+            player_buf,
+            show_all=True,
+            angle_step=4,
+            overlap_px=45,
+            scale=0.2
+        )
+        player_buf.seek(0)
+        files.append(discord.File(player_buf, filename="player.png"))
+
         return files
 
     def build_dealer_embed(self, st: Dict, *, reveal: bool, footer: Optional[str]=None) -> discord.Embed:
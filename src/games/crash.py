@@ -3,6 +3,8 @@ import os
 import math
 import random
 import asyncio
+import itertools
+import logging
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Tuple
 
@@ -16,6 +18,8 @@ from discord.app_commands import CheckFailure
 from src.bot.base_cog import BaseCog
 from src.utils.utils import is_admin_or_manager
 
+log = logging.getLogger(__name__)
+
 # ============================ Config ============================
 
 # Currency emoji constant
@@ -24,6 +28,7 @@ TC_EMOJI = os.getenv('TC_EMOJI', '💰')
 # Game tuning
 TICK_SECONDS = float(os.getenv("TICK_SECONDS", "0.1"))  # Default: 0.1 seconds per tick
 GROWTH_PER_TICK = float(os.getenv("GROWTH_PER_TICK", "0.02"))  # Default: 2% growth per tick
+EDIT_COALESCE_SECONDS = float(os.getenv("CRASH_EDIT_COALESCE", "0.25"))  # Default: at most ~4 embed edits/sec
 # Mixture risk model (high-risk/high-reward)
 RISK_MIX_P_HARSH = float(os.getenv("RISK_MIX_P_HARSH", "0.65"))  # Default: 65% harsh, 35% lucky
 MEAN_HARSH = float(os.getenv("MEAN_HARSH", "0.8"))  # Default: avg crash ≈ 1.8×
@@ -114,12 +119,19 @@ class Crash(BaseCog):
     def __init__(self, bot: commands.Bot):
         super().__init__(bot)
         self.rounds: Dict[int, RoundState] = {}  # in-memory per-guild
+        self._dirty: Dict[int, asyncio.Event] = {}  # per-guild "embed needs redraw" flag
+        self._editor_tasks: Dict[int, asyncio.Task] = {}  # per-guild debounced editor
     
     async def cog_load(self):
         """Initialize the unified database when cog loads."""
         await super().cog_load()
         print("✅ Unified database initialized for Crash")
 
+    def cog_unload(self):
+        for task in self._editor_tasks.values():
+            task.cancel()
+        self._editor_tasks.clear()
+
     # ---- Clear message for failed permission checks ----
     @commands.Cog.listener()
     async def on_app_command_error(self, interaction: discord.Interaction, error):
@@ -154,7 +166,42 @@ class Crash(BaseCog):
         except Exception:
             return None
 
-    async def _refresh_embed(self, guild_id: int, *, footer: Optional[str] = None):
+    async def _refresh_embed(self, guild_id: int, *, footer: Optional[str] = None, immediate: bool = False):
+        """
+        Request a redraw of the round embed.
+        Regular refreshes (ticks, bets, cashouts) only mark the guild dirty and are
+        coalesced by _editor_loop into one edit per EDIT_COALESCE_SECONDS.
+        Status transitions (and anything with a footer) edit right away.
+        """
+        if immediate or footer is not None:
+            # Drop any pending coalesced edit so it can't land after (and overwrite) this one
+            task = self._editor_tasks.pop(guild_id, None)
+            if task and not task.done():
+                task.cancel()
+            ev = self._dirty.get(guild_id)
+            if ev:
+                ev.clear()
+            await self._edit_embed(guild_id, footer=footer)
+            return
+
+        self._dirty.setdefault(guild_id, asyncio.Event()).set()
+        task = self._editor_tasks.get(guild_id)
+        if task is None or task.done():
+            self._editor_tasks[guild_id] = asyncio.create_task(self._editor_loop(guild_id))
+
+    async def _editor_loop(self, guild_id: int):
+        ev = self._dirty.setdefault(guild_id, asyncio.Event())
+        while True:
+            await ev.wait()
+            await asyncio.sleep(EDIT_COALESCE_SECONDS)
+            ev.clear()
+            try:
+                await self._edit_embed(guild_id)
+            except Exception:
+                # One failed edit (e.g. a transient HTTP error) must not kill the editor task
+                log.exception("Crash embed edit failed (guild %s)", guild_id)
+
+    async def _edit_embed(self, guild_id: int, *, footer: Optional[str] = None):
         rs = self._guild_round(guild_id)
         chmsg = await self._get_channel_message(guild_id)
         if not chmsg:
@@ -193,7 +240,7 @@ class Crash(BaseCog):
 
         if rs.bets:
             lines = []
-            for uid, b in list(rs.bets.items())[:8]:
+            for uid, b in itertools.islice(rs.bets.items(), 8):
                 u = self.bot.get_user(uid)
                 name = u.name if u else str(uid)
                 if rs.status == "COMPLETED":
@@ -239,7 +286,7 @@ class Crash(BaseCog):
         rs.started_ts = int(discord.utils.utcnow().timestamp())
         rs.current_mult = 1.0
         rs.crash_at_multiplier = draw_crash_multiplier()  # mixture risk
-        await self._refresh_embed(guild_id)
+        await self._refresh_embed(guild_id, immediate=True)
 
         # Fly until crash
         while rs.current_mult < rs.crash_at_multiplier and rs.status == "flying":
@@ -449,7 +496,7 @@ class Crash(BaseCog):
         rs = self._guild_round(inter.guild_id)
         if rs.status == "idle":
             return await inter.followup.send("No active crash round. Start one with **/crash start**.", ephemeral=True)
-        await self._refresh_embed(inter.guild_id)
+        await self._refresh_embed(inter.guild_id, immediate=True)
         chmsg = await self._get_channel_message(inter.guild_id)
         if chmsg:
             _, msg = chmsg
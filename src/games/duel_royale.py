@@ -1,9 +1,13 @@
 # duel_royale.py
 # Requires: discord.py >= 2.0
 import asyncio
+import itertools
 import os
 import random
 import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -17,8 +21,12 @@ from src.utils.utils import is_admin_or_manager
 load_dotenv()
 # ========= Tunables =========
 START_HP = 100
-ROUND_DELAY = 1.0              # seconds between narration lines
+ROUND_DELAY = 1.0              # seconds between narration messages
 DUELBET_TIMEOUT = 60           # seconds to accept a /duelbet
+DUEL_HISTORY_LINES = 10        # turns kept on the /duel scoreboard embed
+MAX_ROYALE_SECONDS = 600       # a royale still running after this ends in a stalemate
+MAX_CONCURRENT_FIGHTS = int(os.getenv("DUEL_MAX_CONCURRENT", "2"))  # per guild; shares the channel message budget
+ARENA_MAX_WAIT = int(os.getenv("DUEL_ARENA_MAX_WAIT", "120"))  # seconds a fight may queue; the followup webhook dies at 15 min
 
 # Exodia (special)
 EXODIA_IMAGE_URL = "https://i.imgur.com/gXWD1ze.jpeg"
@@ -102,61 +110,118 @@ BUFFS = [
     ("blessing of vitality", (1.30, 1.60), 0.70),
 ]
 
+# ========= Precomputed tables (built once at import) =========
+# One weighted draw picks the action kind. Same distribution as the old chained rolls:
+# Exodia first, then ultra buff, then buff / heal (shared or solo) / attack.
+_P_EXODIA = EXODIA_TRIGGER_CHANCE
+_P_ULTRA = (1.0 - _P_EXODIA) * ULTRA_BUFF["chance"]
+_P_NORMAL = (1.0 - _P_EXODIA) * (1.0 - ULTRA_BUFF["chance"])
+_KINDS = ('exodia', 'ultra_buff', 'buff', 'heal_shared', 'heal_solo', 'attack')
+_CUM = tuple(itertools.accumulate((
+    _P_EXODIA,
+    _P_ULTRA,
+    _P_NORMAL * BUFF_CHANCE,
+    _P_NORMAL * HEAL_CHANCE * SHARED_HEAL["weight"],
+    _P_NORMAL * HEAL_CHANCE * (1.0 - SHARED_HEAL["weight"]),
+    _P_NORMAL * (1.0 - BUFF_CHANCE - HEAL_CHANCE),
+)))
+_SHARED_LO, _SHARED_HI = SHARED_HEAL["range"]
+_SHARED_CH = SHARED_HEAL["chance"]
+
+def _flatten_pool(pool):
+    """Split a (name, (lo, hi), chance) pool into parallel name/lo/hi/chance columns."""
+    return (
+        tuple(name for name, _, _ in pool),
+        array('d', [lo for _, (lo, _), _ in pool]),
+        array('d', [hi for _, (_, hi), _ in pool]),
+        array('d', [chance for _, _, chance in pool]),
+    )
+
+_ATK_NAMES, _ATK_LO, _ATK_HI, _ATK_CH = _flatten_pool(NORMAL_ATTACKS)
+_HEAL_NAMES, _HEAL_LO, _HEAL_HI_AMT, _HEAL_CH = _flatten_pool(HEALS)
+_BUFF_NAMES, _BUFF_LO, _BUFF_HI_AMT, _BUFF_CH = _flatten_pool(BUFFS)
+
 # ========= Helpers =========
-def roll_from_pool(pool):
-    name, (lo, hi), chance = random.choice(pool)
-    success = (random.random() <= chance)
-    amount = random.uniform(lo, hi) if success else 0.0
-    return name, success, amount
-
-def pick_action():
-    # 1) Exodia (1%)
-    if random.random() < EXODIA_TRIGGER_CHANCE:
-        return {'kind': 'exodia', 'name': "**summon all cards of EXODIA**",
-                'success': True, 'amount': EXODIA_DAMAGE, 'shared': False}
-    # 2) Global ultra buff (1%)
-    if random.random() < ULTRA_BUFF["chance"]:
-        return {'kind': 'ultra_buff', 'name': ULTRA_BUFF["name"],
-                'success': True, 'amount': ULTRA_BUFF["multiplier"], 'shared': False}
-    # 3) Normal decision
-    r = random.random()
-    if r < BUFF_CHANCE:
-        name, success, mult = roll_from_pool(BUFFS)
-        return {'kind': 'buff', 'name': name, 'success': success, 'amount': mult, 'shared': False}
-    elif r < BUFF_CHANCE + HEAL_CHANCE:
-        if random.random() < SHARED_HEAL["weight"]:
-            lo, hi = SHARED_HEAL["range"]
-            success = (random.random() <= SHARED_HEAL["chance"])
-            heal = random.randint(lo, hi) if success else 0
-            return {'kind': 'heal', 'name': SHARED_HEAL["name"], 'success': success,
-                    'amount': int(heal), 'shared': True}
-        else:
-            name, success, heal = roll_from_pool(HEALS)
-            return {'kind': 'heal', 'name': name, 'success': success,
-                    'amount': int(round(heal)), 'shared': False}
-    else:
-        name, success, dmg = roll_from_pool(NORMAL_ATTACKS)
-        return {'kind': 'attack', 'name': name, 'success': success,
-                'amount': int(round(dmg)), 'shared': False}
+# Damage/heal amounts are never negative, so rounding uses int(x + 0.5) (round-half-up)
+# rather than round()'s banker's rounding; the odd .5 tie going up is fine for game numbers.
+@dataclass(slots=True)
+class Action:
+    kind: str        # exodia | ultra_buff | buff | heal | attack
+    name: str
+    success: bool
+    amount: float
+    shared: bool = False
+
+def pick_action(rng=random):
+    """Roll one turn's action. Pass a per-game random.Random to keep games independent/seedable."""
+    rand = rng.random
+    uniform = rng.uniform
+    randrange = rng.randrange
+    kind = rng.choices(_KINDS, cum_weights=_CUM, k=1)[0]
+    # Pool rolls return early on a failed chance roll, skipping the uniform() draw
+    if kind == 'attack':
+        i = randrange(len(_ATK_NAMES))
+        if rand() > _ATK_CH[i]:
+            return Action('attack', _ATK_NAMES[i], False, 0)
+        return Action('attack', _ATK_NAMES[i], True, int(uniform(_ATK_LO[i], _ATK_HI[i]) + 0.5))
+    if kind == 'heal_solo':
+        i = randrange(len(_HEAL_NAMES))
+        if rand() > _HEAL_CH[i]:
+            return Action('heal', _HEAL_NAMES[i], False, 0)
+        return Action('heal', _HEAL_NAMES[i], True, int(uniform(_HEAL_LO[i], _HEAL_HI_AMT[i]) + 0.5))
+    if kind == 'buff':
+        i = randrange(len(_BUFF_NAMES))
+        if rand() > _BUFF_CH[i]:
+            return Action('buff', _BUFF_NAMES[i], False, 0.0)
+        return Action('buff', _BUFF_NAMES[i], True, uniform(_BUFF_LO[i], _BUFF_HI_AMT[i]))
+    if kind == 'heal_shared':
+        success = (rand() <= _SHARED_CH)
+        heal = rng.randint(_SHARED_LO, _SHARED_HI) if success else 0
+        return Action('heal', SHARED_HEAL["name"], success, int(heal), shared=True)
+    if kind == 'ultra_buff':
+        return Action('ultra_buff', ULTRA_BUFF["name"], True, ULTRA_BUFF["multiplier"])
+    return Action('exodia', "**summon all cards of EXODIA**", True, EXODIA_DAMAGE)
 
 def apply_multiplier_if_any(mult_state, attacker_id, base_amount):
     mult = mult_state.get(attacker_id)
     if not mult or base_amount <= 0:
         return int(base_amount), None
-    final = int(round(base_amount * mult))
+    final = int(base_amount * mult + 0.5)
     mult_state.pop(attacker_id, None)
     return final, mult
 
 def fmt_hp(name: str, val: int) -> str:
     return f"{name}: **{val}**" + (" ☠️" if val <= 0 else "")
 
+# Why a user is busy -> message shown when they try to start another fight
+BUSY_ACTIVE = "active"
+BUSY_PENDING = "pending"
+BUSY_MESSAGES = {
+    BUSY_ACTIVE: "Someone is already in a fight.",
+    BUSY_PENDING: "Someone has a pending /duelbet.",
+}
+ARENA_QUEUED_MSG = "⏳ All arenas are busy. This fight is queued and starts as soon as one frees up."
+ARENA_FULL_MSG = "❌ All arenas are still busy, so this fight was called off. Try again in a few minutes."
+
+class _ArenaSlot:
+    """A fight slot taken from a guild's semaphore; gives it back on exit."""
+    __slots__ = ("_sem",)
+
+    def __init__(self, sem: asyncio.Semaphore):
+        self._sem = sem
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._sem.release()
+
 # ========= Cog =========
 class DuelRoyale(BaseCog):
     def __init__(self, bot: commands.Bot):
         super().__init__(bot)
-        # Active users in a live duel/royale
-        self.active_players: set[int] = set()
-        # Pending /duelbet: target_id -> {'challenger': int, 'message_id': int, 'expires': float}
+        # Busy users: user_id -> BUSY_ACTIVE (live duel/royale) or BUSY_PENDING (challenged by /duelbet)
+        self._busy_reason: dict[int, str] = {}
         
         # Set all commands in this cog to be guild-specific
         guild_id = os.getenv("DISCORD_GUILD_ID")
@@ -166,7 +231,10 @@ class DuelRoyale(BaseCog):
         #     for command in self.__cog_app_commands__:
         #         command.guild = guild_obj
         #         print(f"[DuelRoyale] Assigned guild to command: {command.name}")
-        self.pending_bets: dict[int, dict] = {}
+        # Pending /duelbet payload: target_id -> {'challenger', 'message_id', 'message', 'expires', 'handle'}
+        self._pending_meta: dict[int, dict] = {}
+        # Per-guild cap on simultaneously narrating duels/royales
+        self._guild_sems: dict[int, asyncio.Semaphore] = {}
         
     async def cog_load(self):
         """Initialize the unified database when cog loads."""
@@ -185,101 +253,113 @@ class DuelRoyale(BaseCog):
                 p2_balance = await self.get_user_balance(p2.id, interaction.guild_id)
                 
                 if p1_balance.cash < bet_amount:
-                    await followup.send(f"❌ {p1.display_name} doesn't have enough cash for this duel.")
+                    await self._send(followup, f"❌ {p1.display_name} doesn't have enough cash for this duel.")
                     return
                 if p2_balance.cash < bet_amount:
-                    await followup.send(f"❌ {p2.display_name} doesn't have enough cash for this duel.")
+                    await self._send(followup, f"❌ {p2.display_name} doesn't have enough cash for this duel.")
                     return
             except Exception as e:
                 error_msg = f"Error checking balances: {e}"
                 print(error_msg)
-                await followup.send(f"❌ {error_msg}")
+                await self._send(followup, f"❌ {error_msg}")
                 return
         names = {p1.id: p1.display_name, p2.id: p2.display_name}
         hp = {p1.id: START_HP, p2.id: START_HP}
         next_multiplier = {}
 
-        await followup.send(f"⚔️ **Duel begins!** {names[p1.id]} vs {names[p2.id]} for ${bet_amount}")
-        await followup.send(f"Both fighters start at {START_HP} HP.")
-
-        bot_id = self.bot.user.id
-        attacker, defender = p1.id, p2.id
-        round_no = 1
-
-        self.active_players.add(p1.id)
-        self.active_players.add(p2.id)
+        self._busy_reason[p1.id] = BUSY_ACTIVE
+        self._busy_reason[p2.id] = BUSY_ACTIVE
         try:
-            while hp[attacker] > 0 and hp[defender] > 0:
-                if attacker == bot_id:
-                    await followup.send(f"🗣️ **{names[attacker]}**: {BOT_TAUNT}")
-                    act = {'kind': 'attack','name': GODLIKE_ATTACK_NAME,'success': True,'amount': GODLIKE_DAMAGE,'shared': False}
-                else:
-                    act = pick_action()
-
-                header = f"__Round {round_no}__ — **{names[attacker]}** uses {act['name']}!"
-
-                if act['kind'] == 'exodia':
-                    embed = discord.Embed(title="💀 EXODIA OBLITERATE!!! 💀",
-                                          description=f"{names[attacker]} unleashes the forbidden one!",
-                                          color=discord.Color.dark_red())
-                    embed.set_image(url=EXODIA_IMAGE_URL)
-                    await followup.send(embed=embed)
-                    hp[defender] = hp[defender] - EXODIA_DAMAGE
-                    body = f"It deals **{EXODIA_DAMAGE}** damage!"
-
-                elif act['kind'] == 'ultra_buff':
-                    next_multiplier[attacker] = float(act['amount'])
-                    body = f"{names[attacker]} is blessed with **{act['name']}**! Next move ×{act['amount']:.0f}!"
-
-                elif act['kind'] == 'buff':
-                    if act['success']:
-                        next_multiplier[attacker] = float(act['amount'])
-                        body = f"{names[attacker]}'s next move is empowered ×**{act['amount']:.2f}**!"
-                    else:
-                        body = f"{names[attacker]}'s attempt to power up **fails**."
-
-                elif act['kind'] == 'heal':
-                    if act['success']:
-                        heal_amount, consumed = apply_multiplier_if_any(next_multiplier, attacker, act['amount'])
-                        hp[attacker] = hp[attacker] + heal_amount
-                        suff = f" (buff ×{consumed:.2f})" if consumed else ""
-                        extra = ""
-                        if act.get('shared'):
-                            splash = int(round(heal_amount * SHARED_HEAL["splash_ratio"]))
-                            hp[defender] = hp[defender] + splash
-                            extra = f" | {names[defender]} also heals **{splash} HP**."
-                        body = f"Restores **{heal_amount} HP**{suff}.{extra}"
+            # Bound how many fights narrate at once in this guild
+            slot = await self._arena(interaction.guild_id, followup)
+            if slot is None:
+                return
+            async with slot:
+                # One scoreboard message, edited every round, instead of a new message per turn
+                history: deque[str] = deque(maxlen=DUEL_HISTORY_LINES)
+                board = discord.Embed(
+                    title=f"⚔️ Duel — {names[p1.id]} vs {names[p2.id]} for ${bet_amount}",
+                    description=f"Both fighters start at {START_HP} HP.",
+                    color=discord.Color.blurple(),
+                )
+                board.add_field(name="HP", value=f"{fmt_hp(names[p1.id], hp[p1.id])} | {fmt_hp(names[p2.id], hp[p2.id])}", inline=False)
+                scoreboard = await self._send(followup, embed=board, wait=True)
+
+                bot_id = self.bot.user.id
+                rng = random.Random()
+                attacker, defender = p1.id, p2.id
+                round_no = 1
+
+                while hp[attacker] > 0 and hp[defender] > 0:
+                    an, dn = names[attacker], names[defender]
+                    taunt = ""
+                    if attacker == bot_id:
+                        taunt = f"🗣️ **{an}**: {BOT_TAUNT}\n"
+                        act = Action('attack', GODLIKE_ATTACK_NAME, True, GODLIKE_DAMAGE)
                     else:
-                        body = "…but the recovery **fails**!"
+                        act = pick_action(rng)
 
-                else:  # attack
-                    if act['success']:
-                        dmg, consumed = apply_multiplier_if_any(next_multiplier, attacker, act['amount'])
-                        hp[defender] = hp[defender] - dmg
-                        suff = f" (buff ×{consumed:.2f})" if consumed else ""
-                        body = f"Hit for **{dmg}** damage{suff}."
-                    else:
-                        body = "…but it **misses**!"
+                    header = f"__Round {round_no}__ — **{an}** uses {act.name}!"
+
+                    if act.kind == 'exodia':
+                        board.title = "💀 EXODIA OBLITERATE!!! 💀"
+                        board.color = discord.Color.dark_red()
+                        board.set_image(url=EXODIA_IMAGE_URL)
+                        hp[defender] -= EXODIA_DAMAGE
+                        body = f"{an} unleashes the forbidden one! It deals **{EXODIA_DAMAGE}** damage!"
+
+                    elif act.kind == 'ultra_buff':
+                        next_multiplier[attacker] = float(act.amount)
+                        body = f"{an} is blessed with **{act.name}**! Next move ×{act.amount:.0f}!"
 
-                bars = f"HP — {fmt_hp(names[p1.id], hp[p1.id])} | {fmt_hp(names[p2.id], hp[p2.id])}"
-                await followup.send(header)
-                await followup.send(body)
-                await followup.send(bars)
-                await asyncio.sleep(ROUND_DELAY)
+                    elif act.kind == 'buff':
+                        if act.success:
+                            next_multiplier[attacker] = float(act.amount)
+                            body = f"{an}'s next move is empowered ×**{act.amount:.2f}**!"
+                        else:
+                            body = f"{an}'s attempt to power up **fails**."
+
+                    elif act.kind == 'heal':
+                        if act.success:
+                            heal_amount, consumed = apply_multiplier_if_any(next_multiplier, attacker, act.amount)
+                            hp[attacker] += heal_amount
+                            suff = f" (buff ×{consumed:.2f})" if consumed else ""
+                            extra = ""
+                            if act.shared:
+                                splash = int(heal_amount * SHARED_HEAL["splash_ratio"] + 0.5)
+                                hp[defender] += splash
+                                extra = f" | {dn} also heals **{splash} HP**."
+                            body = f"Restores **{heal_amount} HP**{suff}.{extra}"
+                        else:
+                            body = "…but the recovery **fails**!"
+
+                    else:  # attack
+                        if act.success:
+                            dmg, consumed = apply_multiplier_if_any(next_multiplier, attacker, act.amount)
+                            hp[defender] -= dmg
+                            suff = f" (buff ×{consumed:.2f})" if consumed else ""
+                            body = f"Hit for **{dmg}** damage{suff}."
+                        else:
+                            body = "…but it **misses**!"
 
-                attacker, defender = defender, attacker
-                round_no += 1
+                    history.append(f"{taunt}{header}\n{body}")
+                    board.description = "\n".join(history)
+                    board.set_field_at(0, name="HP", value=f"{fmt_hp(names[p1.id], hp[p1.id])} | {fmt_hp(names[p2.id], hp[p2.id])}", inline=False)
+                    await self._paced(scoreboard.edit(embed=board))
 
-            winner_id = attacker if hp[attacker] > 0 else defender
-            loser_id = defender if hp[defender] <= 0 else attacker
-            await followup.send(f"🏆 **{names[winner_id]}** wins the duel!")
+                    attacker, defender = defender, attacker
+                    round_no += 1
+
+                winner_id = attacker if hp[attacker] > 0 else defender
+                loser_id = defender if hp[defender] <= 0 else attacker
+                await self._send(followup, f"🏆 **{names[winner_id]}** wins the duel!")
             
-            # Transfer balance using reusable function
-            if bet_amount > 0:  
-                await self.transfer_balance(interaction.guild_id, winner_id, loser_id, bet_amount, followup)
+                # Transfer balance using reusable function
+                if bet_amount > 0:  
+                    await self.transfer_balance(interaction.guild_id, winner_id, loser_id, bet_amount, followup)
         finally:
-            self.active_players.discard(p1.id)
-            self.active_players.discard(p2.id)
+            self._busy_reason.pop(p1.id, None)
+            self._busy_reason.pop(p2.id, None)
 
 
     async def transfer_balance(self, guild_id: int, winner_id: int, loser_id: int, bet_amount: int, 
@@ -320,10 +400,83 @@ class DuelRoyale(BaseCog):
                 await followup.send(f"❌ {error_msg}")
             return False
 
-    async def narrate(self, followup: discord.Webhook, lines: list[str]):
-        for line in lines:
-            await followup.send(line, allowed_mentions=discord.AllowedMentions.none())
+    def _sem(self, guild_id: int) -> asyncio.Semaphore:
+        sem = self._guild_sems.get(guild_id)
+        if sem is None:
+            sem = self._guild_sems[guild_id] = asyncio.Semaphore(MAX_CONCURRENT_FIGHTS)
+        return sem
+
+    async def _arena(self, guild_id: int, followup: discord.Webhook) -> _ArenaSlot | None:
+        """
+        Take one of the guild's fight slots, telling the channel first if the fight has to queue.
+        Gives up after ARENA_MAX_WAIT so the fight never outlives its interaction webhook;
+        returns None (and says so) in that case.
+        """
+        sem = self._sem(guild_id)
+        if sem.locked():
+            try:
+                await self._send(followup, ARENA_QUEUED_MSG)
+            except Exception:
+                pass
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=ARENA_MAX_WAIT)
+        except asyncio.TimeoutError:
+            try:
+                await self._send(followup, ARENA_FULL_MSG)
+            except Exception:
+                pass
+            return None
+        return _ArenaSlot(sem)
+
+    def _busy_message(self, *user_ids: int) -> str | None:
+        for uid in user_ids:
+            reason = self._busy_reason.get(uid)
+            if reason:
+                return BUSY_MESSAGES[reason]
+        return None
+
+    def _clear_pending(self, target_id: int):
+        meta = self._pending_meta.pop(target_id, None)
+        if meta and meta.get('handle'):
+            meta['handle'].cancel()
+        if self._busy_reason.get(target_id) == BUSY_PENDING:
+            del self._busy_reason[target_id]
+        return meta
+
+    def _expire_bet(self, target_id: int, message_id: int):
+        """call_later callback: drop a /duelbet nobody answered, even if its view was lost."""
+        meta = self._pending_meta.get(target_id)
+        if not meta or meta['message_id'] != message_id:
+            return
+        self._clear_pending(target_id)
+        asyncio.ensure_future(self._disable_bet_message(meta['message']))
+
+    async def _disable_bet_message(self, message: discord.InteractionMessage):
+        try:
+            await message.edit(content=f"{message.content}\n⌛ Bet expired.", view=None)
+        except Exception:
+            pass
+
+    async def _send(self, followup: discord.Webhook, content=discord.utils.MISSING, **kw):
+        """followup.send with mention parsing off unless the caller opts in."""
+        kw.setdefault('allowed_mentions', discord.AllowedMentions.none())
+        return await followup.send(content, **kw)
+
+    async def _paced(self, aw):
+        """
+        Run a send/edit concurrently with the ROUND_DELAY pause, so a turn takes
+        max(network latency, ROUND_DELAY) instead of their sum.
+        """
+        task = asyncio.ensure_future(aw)
+        try:
             await asyncio.sleep(ROUND_DELAY)
+            return await task
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    async def narrate(self, followup: discord.Webhook, lines: list[str]):
+        await self._paced(self._send(followup, "\n".join(lines)))
 
     # ----- Instant /duel -----
     @app_commands.command(name="duel", description="Start a 1v1 duel immediately.")
@@ -338,21 +491,24 @@ class DuelRoyale(BaseCog):
             return await interaction.response.send_message("You can’t duel that bot.", ephemeral=True)
 
         # Busy checks (active duels/royales OR pending duelbet)
-        if author.id in self.active_players or opponent.id in self.active_players:
-            return await interaction.response.send_message("Someone is already in a fight.", ephemeral=True)
-        if author.id in self.pending_bets or opponent.id in self.pending_bets:
-            return await interaction.response.send_message("Someone has a pending /duelbet.", ephemeral=True)
+        busy = self._busy_message(author.id, opponent.id)
+        if busy:
+            return await interaction.response.send_message(busy, ephemeral=True)
 
         await interaction.response.defer(thinking=False)
         await self._run_duel(interaction, author, opponent, bet_amount)
 
     # ----- Button-based /duelbet (requires accept/decline) -----
     class BetView(discord.ui.View):
-        def __init__(self, cog: "DuelRoyale", challenger_id: int, target_id: int, bet_amount: int):
+        def __init__(self, cog: "DuelRoyale", challenger: discord.Member, target: discord.Member, bet_amount: int):
             super().__init__(timeout=DUELBET_TIMEOUT)
             self.cog = cog
-            self.challenger_id = challenger_id
-            self.target_id = target_id
+            # Keep the members themselves: the view lives for seconds, and re-resolving
+            # via guild.get_member can return None when the member cache is cold.
+            self.challenger = challenger
+            self.target = target
+            self.challenger_id = challenger.id
+            self.target_id = target.id
             self.bet_amount = bet_amount
 
         async def interaction_check(self, itx: discord.Interaction) -> bool:
@@ -365,25 +521,24 @@ class DuelRoyale(BaseCog):
         @discord.ui.button(label="Accept", style=discord.ButtonStyle.success)
         async def accept(self, itx: discord.Interaction, button: discord.ui.Button):
             # Remove pending
-            self.cog.pending_bets.pop(self.target_id, None)
+            self.cog._clear_pending(self.target_id)
             # Busy checks again right before starting
-            if self.challenger_id in self.cog.active_players or self.target_id in self.cog.active_players:
+            busy = self.cog._busy_reason
+            if busy.get(self.challenger_id) == BUSY_ACTIVE or busy.get(self.target_id) == BUSY_ACTIVE:
                 return await itx.response.edit_message(content="Fight can’t start; someone is already busy.", view=None)
             await itx.response.edit_message(content="✅ Bet accepted! Starting duel…", view=None)
             # Start duel
-            challenger = itx.guild.get_member(self.challenger_id)
-            target = itx.guild.get_member(self.target_id)
             fake_interaction = itx  # reuse followup pipe
-            await self.cog._run_duel(fake_interaction, challenger, target, self.bet_amount)
+            await self.cog._run_duel(fake_interaction, self.challenger, self.target, self.bet_amount)
 
         @discord.ui.button(label="Decline", style=discord.ButtonStyle.danger)
         async def decline(self, itx: discord.Interaction, button: discord.ui.Button):
-            self.cog.pending_bets.pop(self.target_id, None)
+            self.cog._clear_pending(self.target_id)
             await itx.response.edit_message(content="❌ Bet declined.", view=None)
 
         async def on_timeout(self):
             # Clean up if still pending
-            self.cog.pending_bets.pop(self.target_id, None)
+            self.cog._clear_pending(self.target_id)
             # Try to edit the original message if we can
             try:
                 for child in self.children:
@@ -403,24 +558,145 @@ class DuelRoyale(BaseCog):
             return await interaction.response.send_message("You can’t duel that bot.", ephemeral=True)
 
         # Busy checks
-        if author.id in self.active_players or opponent.id in self.active_players:
-            return await interaction.response.send_message("Someone is already in a fight.", ephemeral=True)
-        if author.id in self.pending_bets or opponent.id in self.pending_bets:
-            return await interaction.response.send_message("Someone already has a pending /duelbet.", ephemeral=True)
+        busy = self._busy_message(author.id, opponent.id)
+        if busy:
+            return await interaction.response.send_message(busy, ephemeral=True)
 
-        view = DuelRoyale.BetView(self, author.id, opponent.id, bet_amount)
+        view = DuelRoyale.BetView(self, author, opponent, bet_amount)
         msg = f"📨 **{author.mention}** challenged {opponent.mention} to a **bet duel**!"
         if bet_amount:
             msg += f"  _({bet_amount})_"
         await interaction.response.send_message(msg, view=view, allowed_mentions=discord.AllowedMentions(users=True))
         # mark pending
         sent = await interaction.original_response()
-        self.pending_bets[opponent.id] = {
+        self._busy_reason[opponent.id] = BUSY_PENDING
+        self._pending_meta[opponent.id] = {
             'challenger': author.id,
             'message_id': sent.id,
-            'expires': time.time() + DUELBET_TIMEOUT
+            'message': sent,
+            'expires': time.time() + DUELBET_TIMEOUT,
+            'handle': asyncio.get_running_loop().call_later(DUELBET_TIMEOUT, self._expire_bet, opponent.id, sent.id),
         }
 
+    async def _run_royale_core(self, followup: discord.Webhook, names: list[str]) -> int:
+        """Play royale rounds until one player is left; returns the winner's roster position."""
+        # Structure-of-arrays, indexed by roster position (not user id)
+        n_players = len(names)
+        hp = array('q', [START_HP]) * n_players
+        alive_mask = bytearray(b"\x01") * n_players
+        alive = list(range(n_players))
+        next_multiplier = {}  # position -> pending multiplier (see apply_multiplier_if_any)
+        round_no = 1
+
+        rng = random.Random()
+        while len(alive) > 1:
+            # Whole round is narrated in one embed → one REST call per round
+            round_lines: list[str] = []
+            eliminated: list[str] = []
+            exodia_attacker = None
+
+            # Rotate turn order from a random start (one RNG draw instead of a shuffle).
+            # Iterate a snapshot: eliminations during the round mutate `alive`.
+            order = alive[:]
+            n_order = len(order)
+            start = rng.randrange(n_order)
+            for i in range(n_order):
+                attacker = order[(start + i) % n_order]
+                if not alive_mask[attacker]:
+                    continue
+                targets = [pid for pid in alive if pid != attacker]
+                if not targets:
+                    break
+                defender = rng.choice(targets)
+                an, dn = names[attacker], names[defender]
+                act = pick_action(rng)
+
+                if act.kind == 'exodia':
+                    exodia_attacker = attacker
+                    for pid in alive:
+                        if pid != attacker:
+                            hp[pid] -= EXODIA_DAMAGE
+                            alive_mask[pid] = 0
+                    round_lines.append(f"💀 **{an}** summons the forbidden one and wipes the arena!")
+                    eliminated.extend(names[pid] for pid in alive if pid != attacker)
+                    alive = [attacker]
+                    break
+
+                elif act.kind == 'ultra_buff':
+                    next_multiplier[attacker] = float(act.amount)
+                    l1 = f"{an} is blessed with **{act.name}**!"
+                    l2 = f"Next move ×{act.amount:.0f}."
+
+                elif act.kind == 'buff':
+                    if act.success:
+                        next_multiplier[attacker] = float(act.amount)
+                        l1 = f"{an} enters {act.name}!"
+                        l2 = f"Their next move is empowered ×**{act.amount:.2f}**."
+                    else:
+                        l1 = f"{an} attempts {act.name}…"
+                        l2 = "but it **fails**."
+
+                elif act.kind == 'heal':
+                    if act.success:
+                        heal, consumed = apply_multiplier_if_any(next_multiplier, attacker, act.amount)
+                        hp[attacker] += heal
+                        if act.shared:
+                            splash = int(heal * SHARED_HEAL["splash_ratio"] + 0.5)
+                            for pid in alive:
+                                if pid != attacker:
+                                    hp[pid] += splash
+                            l1 = f"{an} {act.name}!"
+                            l2 = f"Restores **{heal} HP** to self" + (f" (buff ×{consumed:.2f})" if consumed else "")
+                            l2 += f" and **{splash} HP** to everyone else!"
+                        else:
+                            l1 = f"{an} {act.name}!"
+                            l2 = f"Restores **{heal} HP**" + (f" (buff ×{consumed:.2f})" if consumed else "")
+                    else:
+                        l1 = f"{an} tries to {act.name}…"
+                        l2 = "but it **fails**."
+
+                else:  # attack
+                    if act.success:
+                        dmg, consumed = apply_multiplier_if_any(next_multiplier, attacker, act.amount)
+                        hp[defender] -= dmg
+                        l1 = f"{an} uses {act.name} on {dn}!"
+                        l2 = f"It hits for **{dmg}**!" + (f" (buff ×{consumed:.2f})" if consumed else "")
+                    else:
+                        l1 = f"{an} uses {act.name} on {dn}!"
+                        l2 = "It **misses**!"
+
+                round_lines.extend((l1, l2))
+
+                if hp[defender] <= 0 and alive_mask[defender]:
+                    alive_mask[defender] = 0
+                    alive.remove(defender)
+                    eliminated.append(dn)
+
+            embed = discord.Embed(
+                title=f"💀 Round {round_no} — EXODIA OBLITERATE!!! 💀" if exodia_attacker is not None else f"— Round {round_no} —",
+                description="\n".join(round_lines),
+                color=discord.Color.dark_red() if exodia_attacker is not None else discord.Color.blurple(),
+            )
+            if exodia_attacker is not None:
+                embed.set_image(url=EXODIA_IMAGE_URL)
+            if eliminated:
+                embed.add_field(
+                    name="💀 Eliminated",
+                    value=", ".join(f"**{n}**" for n in eliminated) + f" ({len(alive)} remaining)",
+                    inline=False,
+                )
+            # HP is rendered once per round, after every turn has been applied
+            hp_line = " | ".join(fmt_hp(names[pid], hp[pid]) for pid in alive)
+            embed.add_field(name="HP", value=hp_line, inline=False)
+            await self._paced(self._send(followup, embed=embed))
+
+            if len(alive) == 1:
+                break
+
+            round_no += 1
+
+        return alive[0]
+
     # ----- Instant /royale -----
     @app_commands.command(name="royale", description="Start a multi-player battle royale immediately.")
     @app_commands.describe(
@@ -455,7 +731,7 @@ class DuelRoyale(BaseCog):
             )
 
         # Busy blocks: active fight or pending duelbet
-        busy = [m.display_name for m in roster if (m.id in self.active_players or m.id in self.pending_bets)]
+        busy = [m.display_name for m in roster if m.id in self._busy_reason]
         if busy:
             pretty = ", ".join(f"**{n}**" for n in busy)
             return await interaction.response.send_message(
@@ -465,119 +741,36 @@ class DuelRoyale(BaseCog):
         await interaction.response.defer(thinking=False)
         followup = interaction.followup
 
-        names = {m.id: m.display_name for m in roster}
-        hp = {m.id: START_HP for m in roster}
-        alive = [m.id for m in roster]
-        next_multiplier = {}
-
-        await self.narrate(followup, [
-            f"👑 **Battle Royale begins!** ({len(roster)} players)",
-            ", ".join(f"**{m.display_name}**" for m in roster),
-            f"All start at {START_HP} HP. Last one standing wins!"
-        ])
+        names = [m.display_name for m in roster]
 
         # lock everyone
         for m in roster:
-            self.active_players.add(m.id)
+            self._busy_reason[m.id] = BUSY_ACTIVE
 
-        round_no = 1
         try:
-            while len(alive) > 1:
-                await followup.send(f"— **Round {round_no}** —")
-                random.shuffle(alive)
-
-                for attacker in list(alive):
-                    if attacker not in alive:
-                        continue
-                    targets = [pid for pid in alive if pid != attacker]
-                    if not targets:
-                        break
-                    defender = random.choice(targets)
-                    act = pick_action()
-
-                    if act['kind'] == 'exodia':
-                        embed = discord.Embed(
-                            title="💀 EXODIA OBLITERATE!!! 💀",
-                            description=f"**{names[attacker]}** summons the forbidden one and wipes the arena!",
-                            color=discord.Color.dark_red()
-                        )
-                        embed.set_image(url=EXODIA_IMAGE_URL)
-                        await followup.send(embed=embed)
-
-                        for pid in list(alive):
-                            if pid != attacker:
-                                hp[pid] = hp[pid] - EXODIA_DAMAGE
-                        eliminated_names = [names[pid] for pid in alive if pid != attacker]
-                        if eliminated_names:
-                            await followup.send("💥 " + ", ".join(f"**{n}**" for n in eliminated_names) + " are obliterated!")
-                        alive = [attacker]
-                        break
-
-                    elif act['kind'] == 'ultra_buff':
-                        next_multiplier[attacker] = float(act['amount'])
-                        l1 = f"{names[attacker]} is blessed with **{act['name']}**!"
-                        l2 = f"Next move ×{act['amount']:.0f}."
-                        l3 = f"{fmt_hp(names[attacker], hp[attacker])}"
-
-                    elif act['kind'] == 'buff':
-                        if act['success']:
-                            next_multiplier[attacker] = float(act['amount'])
-                            l1 = f"{names[attacker]} enters {act['name']}!"
-                            l2 = f"Their next move is empowered ×**{act['amount']:.2f}**."
-                        else:
-                            l1 = f"{names[attacker]} attempts {act['name']}…"
-                            l2 = "but it **fails**."
-                        l3 = f"{fmt_hp(names[attacker], hp[attacker])}"
-
-                    elif act['kind'] == 'heal':
-                        if act['success']:
-                            heal, consumed = apply_multiplier_if_any(next_multiplier, attacker, act['amount'])
-                            hp[attacker] = hp[attacker] + heal
-                            if act.get('shared'):
-                                splash = int(round(heal * SHARED_HEAL["splash_ratio"]))
-                                for pid in alive:
-                                    if pid != attacker:
-                                        hp[pid] = hp[pid] + splash
-                                l1 = f"{names[attacker]} {act['name']}!"
-                                l2 = f"Restores **{heal} HP** to self" + (f" (buff ×{consumed:.2f})" if consumed else "")
-                                l2 += f" and **{splash} HP** to everyone else!"
-                            else:
-                                l1 = f"{names[attacker]} {act['name']}!"
-                                l2 = f"Restores **{heal} HP**" + (f" (buff ×{consumed:.2f})" if consumed else "")
-                            l3 = f"{fmt_hp(names[attacker], hp[attacker])}"
-                        else:
-                            l1 = f"{names[attacker]} tries to {act['name']}…"
-                            l2 = "but it **fails**."
-                            l3 = f"{fmt_hp(names[attacker], hp[attacker])}"
-
-                    else:  # attack
-                        if act['success']:
-                            dmg, consumed = apply_multiplier_if_any(next_multiplier, attacker, act['amount'])
-                            hp[defender] = hp[defender] - dmg
-                            l1 = f"{names[attacker]} uses {act['name']} on {names[defender]}!"
-                            l2 = f"It hits for **{dmg}**!" + (f" (buff ×{consumed:.2f})" if consumed else "")
-                        else:
-                            l1 = f"{names[attacker]} uses {act['name']} on {names[defender]}!"
-                            l2 = "It **misses**!"
-                        l3 = f"{fmt_hp(names[defender], hp[defender])}"
-
-                    await self.narrate(followup, [l1, l2, l3])
-
-                    if hp[defender] <= 0 and defender in alive:
-                        alive.remove(defender)
-                        await followup.send(f"💀 **{names[defender]}** has been eliminated! ({len(alive)} remaining)")
-                    await asyncio.sleep(ROUND_DELAY)
-
-                if len(alive) == 1:
-                    break
-
-                round_no += 1
-
-            winner_id = alive[0]
-            await followup.send(f"🏆 **{names[winner_id]}** wins the Royale!")
+            # Bound how many fights narrate at once in this guild
+            slot = await self._arena(interaction.guild_id, followup)
+            if slot is None:
+                return
+            async with slot:
+                await self.narrate(followup, [
+                    f"👑 **Battle Royale begins!** ({len(roster)} players)",
+                    ", ".join(f"**{m.display_name}**" for m in roster),
+                    f"All start at {START_HP} HP. Last one standing wins!"
+                ])
+
+                # Bound total game length: heal/buff stacking can otherwise stall a royale for ages
+                try:
+                    winner_pos = await asyncio.wait_for(
+                        self._run_royale_core(followup, names), timeout=MAX_ROYALE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    await self._send(followup, "⏱️ Stalemate — the royale timed out with no winner.")
+                else:
+                    await self._send(followup, f"🏆 **{names[winner_pos]}** wins the Royale!")
         finally:
             for m in roster:
-                self.active_players.discard(m.id)
+                self._busy_reason.pop(m.id, None)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(DuelRoyale(bot))
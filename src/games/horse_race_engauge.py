@@ -1,11 +1,13 @@
 import asyncio
 import json
+import logging
 import math
 import os
 import random
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import discord
 from discord import app_commands
@@ -16,52 +18,213 @@ from dotenv import load_dotenv
 from src.bot.base_cog import BaseCog
 from src.utils.utils import is_admin_or_manager
 
+# orjson is optional; fall back to stdlib json when it isn't installed
+try:
+    import orjson
+
+    _ORJSON_OPTS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+    def _json_line_tail(event: dict) -> bytes:
+        return orjson.dumps(event, option=_ORJSON_OPTS)[1:]
+except ImportError:
+    def _json_line_tail(event: dict) -> bytes:
+        return (json.dumps(event, ensure_ascii=False)[1:] + "\n").encode("utf-8")
+
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 # Currency emoji constant
 TC_EMOJI = os.getenv('TC_EMOJI', '💰')
 
 # ================= Currency =================
+# Resolved once at import (env is loaded above); fmt() runs on every embed line
+_CURRENCY = (os.getenv("TC_EMOJI") or "").strip() or TC_EMOJI
+
 def cur() -> str:
-    v = (os.getenv("TC_EMOJI") or "").strip()
-    return v if v else TC_EMOJI
+    return _CURRENCY
 
-def fmt(n: int) -> str:
-    return f"{cur()} {n:,}"
+fmt = f"{_CURRENCY} {{:,}}".format
 
 
 # ================= Logger =====================
+TX_FLUSH_INTERVAL = float(os.getenv("TX_FLUSH_INTERVAL", "0.1"))   # seconds to gather a batch
+TX_FLUSH_MAX = int(os.getenv("TX_FLUSH_MAX", "256"))               # lines per write
+TX_FSYNC = os.getenv("TX_FSYNC", "").lower() in ("1", "true", "yes")
+TX_FSYNC_INTERVAL = float(os.getenv("TX_FSYNC_INTERVAL", "1.0"))   # seconds between fsyncs when TX_FSYNC is on
+TX_SEND_INTERVAL = float(os.getenv("TX_SEND_INTERVAL", "1.5"))     # seconds between race log channel messages
+TX_CHANNEL_RETRY = float(os.getenv("TX_CHANNEL_RETRY", "300"))     # seconds before re-resolving a missing log channel
+_MONEY_KEYS = frozenset(("amount", "pot", "prize_pool", "rake", "balance_after"))
+
 class TxLog:
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # TRANSACTION_LOG_PATH="" turns the file sink off
         self.path = os.getenv("TRANSACTION_LOG_PATH", "transactions.jsonl")
         ch = (os.getenv("RACE_LOG_CHANNEL_ID") or "").strip()
         self.log_channel_id: Optional[int] = int(ch) if ch.isdigit() else None
+        self._enabled = bool(self.path) or bool(self.log_channel_id)
+        self._log_channel: Optional[discord.TextChannel] = None  # resolved on first send
+        self._channel_retry_at = 0.0  # monotonic time before which a failed lookup isn't retried
         self.guild_id = int(os.getenv("DISCORD_GUILD_ID", "0"))
-
-    async def write(self, kind: str, payload: dict):
-        # Log to JSONL file (for backward compatibility)
-        event = {"ts": datetime.now(timezone.utc).isoformat(), "type": kind, **payload}
+        # JSONL lines are queued and appended in batches through one open handle
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._f = None
+        self._synced_at = 0.0
+        # Single worker so flushes stay ordered; file I/O and fsync never block the event loop
+        self._io: Optional[ThreadPoolExecutor] = None
+        # Channel embeds go through their own queue so a slow send never holds up the caller
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._sender_task: Optional[asyncio.Task] = None
+
+    def _enqueue(self, line: bytes):
+        if self._writer_task is None:
+            self._queue = asyncio.Queue()
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="txlog")
+            self._writer_task = asyncio.create_task(self._writer())
+        self._queue.put_nowait(line)
+
+    async def _writer(self):
+        q = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await q.get()
+            if line is None:
+                return
+            batch = [line]
+            await asyncio.sleep(TX_FLUSH_INTERVAL)
+            done = False
+            while len(batch) < TX_FLUSH_MAX and not q.empty():
+                line = q.get_nowait()
+                if line is None:
+                    done = True
+                    break
+                batch.append(line)
+            await loop.run_in_executor(self._io, self._flush, batch)
+            if done:
+                return
+
+    def _flush(self, batch: List[bytes]):
         try:
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            if self._f is None:
+                # Binary append: lines arrive pre-encoded, so no text-layer encode per write
+                self._f = open(self.path, "ab", buffering=1 << 17)
+            # One timestamp per batch: each queued line is the event JSON minus its opening
+            # "{", so the shared "ts" is spliced in front to keep it the first key
+            head = b'{"ts":"' + discord.utils.utcnow().isoformat().encode() + b'",'
+            self._f.write(b"".join(head + line for line in batch))
+            self._f.flush()
+            # Group commit: one fsync covers every batch flushed since the last one
+            if TX_FSYNC and time.monotonic() - self._synced_at >= TX_FSYNC_INTERVAL:
+                os.fsync(self._f.fileno())
+                self._synced_at = time.monotonic()
         except Exception:
             pass
-        
-        # Log to Discord channel if configured
-        if self.log_channel_id:
+
+    async def _sender(self):
+        # Up to 10 embeds per message (Discord's cap), one send at a time and spaced out,
+        # so a burst of payouts becomes a few messages instead of a run of 429s
+        q = self._send_queue
+        done = False
+        while not done:
+            embed = await q.get()
+            if embed is None:
+                return
+            batch = [embed]
+            while len(batch) < 10 and not q.empty():
+                embed = q.get_nowait()
+                if embed is None:
+                    done = True
+                    break
+                batch.append(embed)
+            # One clock read stamps the whole message
+            now = discord.utils.utcnow()
+            for e in batch:
+                e.timestamp = now
+            # discord.py already waits out and retries 429s inside ch.send
             try:
-                ch = self.bot.get_channel(self.log_channel_id) or await self.bot.fetch_channel(self.log_channel_id)
-                if isinstance(ch, discord.TextChannel):
-                    embed = discord.Embed(title=f"Race Log • {kind}", color=discord.Color.blurple())
-                    for k, v in payload.items():
-                        if k in ("amount", "pot", "prize_pool", "rake", "balance_after"):
-                            try: v = fmt(int(v))
-                            except: pass
-                        embed.add_field(name=k, value=str(v), inline=True)
-                    await ch.send(embed=embed)
+                ch = await self._get_log_channel()
+                if ch is not None:
+                    await ch.send(embeds=batch)
+            except (discord.NotFound, discord.Forbidden):
+                # Channel deleted or access revoked: drop the cached object and look it up again later
+                self._log_channel = None
+                self._channel_retry_at = time.monotonic() + TX_CHANNEL_RETRY
             except Exception:
                 pass
+            await asyncio.sleep(TX_SEND_INTERVAL)
+
+    async def _get_log_channel(self) -> Optional[discord.TextChannel]:
+        """The race log channel, resolved once; a failed lookup isn't retried for TX_CHANNEL_RETRY seconds."""
+        ch = self._log_channel
+        if ch is not None or time.monotonic() < self._channel_retry_at:
+            return ch
+        ch = self.bot.get_channel(self.log_channel_id)
+        if ch is None:
+            try:
+                ch = await self.bot.fetch_channel(self.log_channel_id)
+            except discord.HTTPException:
+                ch = None
+        if isinstance(ch, discord.TextChannel):
+            self._log_channel = ch
+            return ch
+        self._channel_retry_at = time.monotonic() + TX_CHANNEL_RETRY
+        return None
+
+    def _render(self, kind: str, payload: dict) -> Tuple[Optional[bytes], Optional[discord.Embed]]:
+        """Build the JSONL line and the channel embed for one event in a single walk of payload."""
+        embed = None
+        if self.log_channel_id:
+            embed = discord.Embed(title=f"Race Log • {kind}", color=discord.Color.blurple())
+            for k, v in payload.items():
+                if k in _MONEY_KEYS:
+                    try: v = fmt(int(v))
+                    except: pass
+                embed.add_field(name=k, value=str(v), inline=True)
+        line = _json_line_tail({"type": kind, **payload}) if self.path else None
+        return line, embed
+
+    async def close(self):
+        """Flush anything still queued and close the file."""
+        if self._sender_task is not None:
+            self._send_queue.put_nowait(None)
+            await self._sender_task
+            self._sender_task = None
+        if self._writer_task is not None:
+            self._queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        if self._f is not None:
+            try:
+                if TX_FSYNC:
+                    os.fsync(self._f.fileno())
+            except OSError:
+                pass
+            self._f.close()
+            self._f = None
+        if self._io is not None:
+            self._io.shutdown(wait=False)
+            self._io = None
+
+    async def write(self, kind: str, payload: dict):
+        if not self._enabled:
+            return
+        try:
+            line, embed = self._render(kind, payload)
+        except Exception:
+            return
+
+        # Log to JSONL file (for backward compatibility)
+        if line is not None:
+            self._enqueue(line)
+
+        # Log to Discord channel if configured; sent in the background so payouts don't wait on it
+        if embed is not None:
+            if self._sender_task is None:
+                self._send_queue = asyncio.Queue()
+                self._sender_task = asyncio.create_task(self._sender())
+            self._send_queue.put_nowait(embed)
 
 # ================= Game state =============+
 HORSE_SETS = [
@@ -71,13 +234,12 @@ HORSE_SETS = [
 ]
 
 TRACK_LEN = 28
-
-@dataclass
-class Bet:
-    user_id: int
-    username: str
-    horse: int
-    amount: int
+# Every possible bar (0..TRACK_LEN cells, finish flag included), so track() is a table lookup per horse
+_BARS = tuple(f"‖{'■' * p}{'·' * (TRACK_LEN - p)}‖" + (" 🏁" if p >= TRACK_LEN else "")
+              for p in range(TRACK_LEN + 1))
+LOBBY_EDIT_DEBOUNCE = float(os.getenv("RACE_LOBBY_EDIT_DEBOUNCE", "1.0"))  # seconds; bets in this window share one edit
+MAX_BETS_PER_RACE = int(os.getenv("RACE_MAX_BETS", "500"))
+RACE_FRAME_MIN_GAP = float(os.getenv("RACE_FRAME_MIN_GAP", "0.9"))  # seconds between race frame edits
 
 class Race:
     def __init__(self, channel_id: int, host_id: int, horses: List[str],
@@ -86,21 +248,57 @@ class Race:
         self.host_id = host_id
         self.horses = horses
         self.positions = [0.0 for _ in horses]
+        self._row_prefix = [f"{i+1:>2}. {name:<12} " for i, name in enumerate(horses)]
+        self._numbered_horses = "\n".join(f"**{i+1}. {name}**" for i, name in enumerate(horses))
+        # Lowercased names for /bet lookup and autocomplete (fires per keystroke)
+        self._horses_lower = [h.lower() for h in horses]
+        self._horse_by_lower = {h: i for i, h in reversed(list(enumerate(self._horses_lower)))}
+        # Autocomplete answer for an empty query (what every user sees first), same order as scoring gives
+        self._all_choices = [app_commands.Choice(name=n, value=n) for n in sorted(horses)[:25]]
         self.finished: List[int] = []
-        self.bets: List[Bet] = []
+        # Own RNG per race; the seed goes in the race_start log so a race can be replayed
+        self.seed = random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self._first_finish_tick: Optional[int] = None
+        # Bets as parallel columns (one row per bet) instead of an object per bet
+        self.bet_user_ids = array("q")
+        self.bet_usernames: List[str] = []
+        self.bet_horses = array("b")
+        self.bet_amounts = array("q")
         self.open = True
         self.rake_bps = rake_bps
         self.min_bet = min_bet
         self.max_bet = max_bet
         self.msg: Optional[discord.Message] = None
         self.lobby: Optional[discord.Message] = None
+        self.view: Optional[discord.ui.View] = None
         self.ended = False
+        self._edit_pending: Optional[asyncio.Task] = None   # debounce window open
+        self._edit_inflight: Optional[asyncio.Task] = None  # edit request on the wire
+        # Running totals kept by add_bet so pool()/pool_for() don't rescan bets
+        self._total = 0
+        self._per_horse = [0] * len(horses)
+        self._odds_cache: Dict[Tuple[int, int, int], str] = {}  # (horse, horse pool, prize) -> odds line
+
+    def add_bet(self, user_id: int, username: str, horse: int, amount: int):
+        self.bet_user_ids.append(user_id)
+        self.bet_usernames.append(username)
+        self.bet_horses.append(horse)
+        self.bet_amounts.append(amount)
+        self._total += amount
+        self._per_horse[horse] += amount
+
+    def bet_count(self) -> int:
+        return len(self.bet_amounts)
+
+    def bets_full(self) -> bool:
+        return len(self.bet_amounts) >= MAX_BETS_PER_RACE
 
     def pool(self) -> int:
-        return sum(b.amount for b in self.bets)
+        return self._total
 
     def pool_for(self, idx: int) -> int:
-        return sum(b.amount for b in self.bets if b.horse == idx)
+        return self._per_horse[idx]
 
 # ================= Views ==================
 class BetModal(discord.ui.Modal, title="Place Your Bet"):
@@ -123,36 +321,25 @@ class BetModal(discord.ui.Modal, title="Place Your Bet"):
             return await interaction.response.send_message(f"Minimum bet is {fmt(self.race.min_bet)}.", ephemeral=True)
         if self.race.max_bet and amt > self.race.max_bet:
             return await interaction.response.send_message(f"Maximum bet is {fmt(self.race.max_bet)}.", ephemeral=True)
+        if self.race.bets_full():
+            return await interaction.response.send_message("This race has reached its bet limit.", ephemeral=True)
         try:
-            # Check balance first
-            if not await self.cog.check_balance(interaction.user.id, interaction.guild_id, amt):
+            # Deduct the amount; the new balance comes back from the same write
+            bal_after = await self.cog.try_deduct_cash(interaction.user.id, interaction.guild_id, amt, "Horse race bet")
+            if bal_after is None:
                 current_balance = await self.cog.get_user_balance(interaction.user.id, interaction.guild_id)
                 return await interaction.response.send_message(f"Insufficient funds: have {fmt(current_balance.cash)}, need {fmt(amt)}", ephemeral=True)
-            
-            # Deduct the amount
-            success = await self.cog.deduct_cash(interaction.user.id, interaction.guild_id, amt, "Horse race bet")
-            if not success:
-                current_balance = await self.cog.get_user_balance(interaction.user.id, interaction.guild_id)
-                return await interaction.response.send_message(f"Insufficient funds: have {fmt(current_balance.cash)}, need {fmt(amt)}", ephemeral=True)
-            
-            # Get new balance
-            bal_after = await self.cog.get_user_balance(interaction.user.id, interaction.guild_id)
         except Exception as e:
             return await interaction.response.send_message(f"Couldn't place bet: {e}", ephemeral=True)
 
-        self.race.bets.append(Bet(interaction.user.id, interaction.user.display_name, self.horse_idx, amt))
+        self.race.add_bet(interaction.user.id, interaction.user.display_name, self.horse_idx, amt)
         await self.cog.tx.write("bet_placed", {
             "user_id": str(interaction.user.id), "username": interaction.user.display_name,
             "horse_idx": self.horse_idx, "horse_name": self.race.horses[self.horse_idx],
             "amount": amt, "balance_after": bal_after
         })
         await interaction.response.send_message(f"Bet placed: **{fmt(amt)}** on **{self.race.horses[self.horse_idx]}**.", ephemeral=True)
-        try:
-            if self.race.lobby:
-                await self.race.lobby.edit(embed=self.cog.lobby_embed(self.race),
-                                           view=LobbyView(self.cog, self.race))
-        except Exception:
-            pass
+        self.cog.request_lobby_update(self.race)
 
 class HorseSelect(discord.ui.Select):
     def __init__(self, cog: "HorseRace", race: Race):
@@ -180,6 +367,7 @@ class LobbyView(discord.ui.View):
         if not self.race.open:
             return await interaction.response.send_message("Betting is already closed.", ephemeral=True)
         self.race.open = False
+        self.cog.cancel_lobby_update(self.race)
         await interaction.response.send_message("Betting closed! Race is starting…")
         try:
             await self.race.lobby.edit(embed=self.cog.lobby_embed(self.race), view=None)
@@ -194,19 +382,52 @@ class HorseRace(BaseCog):
         self.tx = TxLog(bot)
         self.active: Dict[int, Race] = {}  # channel_id -> race
 
+    async def cog_unload(self):
+        await self.tx.close()
+
     # ---- UI helpers ----
+    def request_lobby_update(self, r: Race):
+        """Schedule one lobby re-render; bets landing inside the window share it."""
+        if r._edit_pending is None:
+            r._edit_pending = asyncio.create_task(self._debounced_lobby_edit(r))
+
+    def cancel_lobby_update(self, r: Race):
+        """Drop any queued or in-flight lobby edit so it can't land after betting closes."""
+        for task in (r._edit_pending, r._edit_inflight):
+            if task is not None:
+                task.cancel()
+        r._edit_pending = r._edit_inflight = None
+
+    async def _debounced_lobby_edit(self, r: Race):
+        await asyncio.sleep(LOBBY_EDIT_DEBOUNCE)
+        # Bets from here on open a new window; this edit may still be cancelled on close
+        r._edit_inflight, r._edit_pending = r._edit_pending, None
+        if not r.lobby or not r.open or r.ended:
+            return
+        try:
+            await r.lobby.edit(embed=self.lobby_embed(r))
+        except Exception:
+            pass
+        finally:
+            if r._edit_inflight is asyncio.current_task():
+                r._edit_inflight = None
+
     def _odds(self, r: Race) -> List[str]:
         pot = r.pool()
         if pot <= 0:
             return []
         rake = math.floor(pot * r.rake_bps / 10000)
         prize = pot - rake
+        cache = r._odds_cache
+        floor = math.floor
         out = []
-        for i, name in enumerate(r.horses):
-            hp = r.pool_for(i)
+        for i, (name, hp) in enumerate(zip(r.horses, r._per_horse)):
             if hp > 0 and prize > 0:
-                per100 = math.floor(prize * 100 / hp)
-                out.append(f"**{name}** — pays {fmt(per100)} per {fmt(100)} (pool: {fmt(hp)})")
+                key = (i, hp, prize)
+                line = cache.get(key)
+                if line is None:
+                    line = cache[key] = f"**{name}** — pays {fmt(floor(prize * 100 / hp))} per {fmt(100)} (pool: {fmt(hp)})"
+                out.append(line)
             else:
                 out.append(f"**{name}** — no bets yet")
         return out
@@ -217,14 +438,10 @@ class HorseRace(BaseCog):
             description="Pick a horse from the dropdown or use `/bet horse:<name> amount:<n>`.",
             color=discord.Color.gold(),
         )
-        e.add_field(name="Horses", value="\n".join([f"**{i+1}. {n}**" for i, n in enumerate(r.horses)]), inline=True)
+        e.add_field(name="Horses", value=r._numbered_horses, inline=True)
         e.add_field(name="Pool", value=f"Total: **{fmt(r.pool())}**\nRake: **{r.rake_bps/100:.2f}%**", inline=True)
-        if r.bets:
-            by = []
-            for i, n in enumerate(r.horses):
-                hp = r.pool_for(i)
-                if hp > 0:
-                    by.append(f"**{n}** — {fmt(hp)}")
+        if r.bet_count():
+            by = [f"**{n}** — {fmt(hp)}" for n, hp in zip(r.horses, r._per_horse) if hp > 0]
             if by:
                 e.add_field(name="By Horse", value="\n".join(by), inline=False)
         odds = self._odds(r)
@@ -234,13 +451,9 @@ class HorseRace(BaseCog):
         return e
 
     def track(self, r: Race) -> str:
-        lines = []
-        for i, (name, pos) in enumerate(zip(r.horses, r.positions)):
-            p = min(int(pos), TRACK_LEN)
-            bar = "‖" + ("■" * p).ljust(TRACK_LEN, "·") + "‖"
-            flag = " 🏁" if p >= TRACK_LEN else ""
-            lines.append(f"{i+1:>2}. {name:<12} {bar}{flag}")
-        return "```\n" + "\n".join(lines) + "\n```"
+        bars = _BARS
+        return "```\n" + "\n".join([prefix + bars[min(int(pos), TRACK_LEN)]
+                                     for prefix, pos in zip(r._row_prefix, r.positions)]) + "\n```"
 
     # ---- Commands ----
     @app_commands.command(name="race", description="Start a horse race betting lobby.")
@@ -276,15 +489,20 @@ class HorseRace(BaseCog):
         await self.tx.write("race_start", {
             "guild_id": str(interaction.guild_id or 0),
             "channel_id": str(ch_id or 0),
-            "horses": names, "rake_bps": rake_bps, "min_bet": min_bet, "max_bet": max_bet
+            "horses": names, "rake_bps": rake_bps, "min_bet": min_bet, "max_bet": max_bet,
+            "seed": str(r.seed)
         })
 
-        msg = await interaction.followup.send(embed=self.lobby_embed(r), view=LobbyView(self, r))
+        # Horses never change during a race, so the lobby view is built once and left in place;
+        # later edits only swap the embed
+        r.view = LobbyView(self, r)
+        msg = await interaction.followup.send(embed=self.lobby_embed(r), view=r.view)
         r.lobby = msg
 
         await asyncio.sleep(max(5, bet_window or 60))
         if not r.ended and r.open:
             r.open = False
+            self.cancel_lobby_update(r)
             try:
                 await r.lobby.edit(embed=self.lobby_embed(r), view=None)
             except Exception:
@@ -302,46 +520,32 @@ class HorseRace(BaseCog):
             return await interaction.response.send_message(f"Minimum bet is {fmt(r.min_bet)}.", ephemeral=True)
         if r.max_bet and amount > r.max_bet:
             return await interaction.response.send_message(f"Maximum bet is {fmt(r.max_bet)}.", ephemeral=True)
+        if r.bets_full():
+            return await interaction.response.send_message("This race has reached its bet limit.", ephemeral=True)
 
         target = (horse or "").strip().lower()
-        idx = None
-        for i, n in enumerate(r.horses):
-            if n.lower() == target:
-                idx = i; break
-        if idx is None:
-            matches = [i for i, n in enumerate(r.horses) if target and target in n.lower()]
-            if matches: idx = matches[0]
+        idx = r._horse_by_lower.get(target)
+        if idx is None and target:
+            idx = next((i for i, n in enumerate(r._horses_lower) if target in n), None)
         if idx is None:
             return await interaction.response.send_message(
                 f"Couldn't find **{horse}**. Options: {', '.join(r.horses)}", ephemeral=True)
 
         try:
-            # Check balance first
-            if not await self.check_balance(interaction.user.id, interaction.guild_id, amount):
+            # Deduct the amount; the new balance comes back from the same write
+            bal_after = await self.try_deduct_cash(interaction.user.id, interaction.guild_id, amount, "Horse race bet")
+            if bal_after is None:
                 current_balance = await self.get_user_balance(interaction.user.id, interaction.guild_id)
                 return await interaction.response.send_message(f"Insufficient funds: have {fmt(current_balance.cash)}, need {fmt(amount)}", ephemeral=True)
-            
-            # Deduct the amount
-            success = await self.deduct_cash(interaction.user.id, interaction.guild_id, amount, "Horse race bet")
-            if not success:
-                current_balance = await self.get_user_balance(interaction.user.id, interaction.guild_id)
-                return await interaction.response.send_message(f"Insufficient funds: have {fmt(current_balance.cash)}, need {fmt(amount)}", ephemeral=True)
-            
-            # Get new balance
-            bal_after = await self.get_user_balance(interaction.user.id, interaction.guild_id)
         except Exception as e:
             return await interaction.response.send_message(f"Couldn't place bet: {e}", ephemeral=True)
 
-        r.bets.append(Bet(interaction.user.id, interaction.user.display_name, idx, amount))
+        r.add_bet(interaction.user.id, interaction.user.display_name, idx, amount)
         await self.tx.write("bet_placed", {
             "user_id": str(interaction.user.id), "username": interaction.user.display_name,
             "horse_idx": idx, "horse_name": r.horses[idx], "amount": amount, "balance_after": bal_after
         })
-        try:
-            if r.lobby:
-                await r.lobby.edit(embed=self.lobby_embed(r), view=LobbyView(self, r))
-        except Exception:
-            pass
+        self.request_lobby_update(r)
         await interaction.response.send_message(
             f"Bet placed: **{fmt(amount)}** on **{r.horses[idx]}**.", ephemeral=True)
 
@@ -351,10 +555,11 @@ class HorseRace(BaseCog):
         if not r:
             return []
         cur = (current or "").lower()
+        if not cur:
+            return r._all_choices
         scored = []
-        for name in r.horses:
-            n = name.lower()
-            score = 0 if cur and n.startswith(cur) else (1 if cur and cur in n else 2)
+        for name, n in zip(r.horses, r._horses_lower):
+            score = 0 if n.startswith(cur) else (1 if cur in n else 2)
             scored.append((score, name))
         scored.sort()
         return [app_commands.Choice(name=n, value=n) for _, n in scored[:25]]
@@ -372,30 +577,95 @@ class HorseRace(BaseCog):
         await self.sim(r, 1.0); await self.finish(interaction, r, payout=True)
 
     async def sim(self, r: Race, tick: float):
-        base = [random.uniform(2.6, 3.2) for _ in r.horses]
-        burst = [random.uniform(0.10, 0.25) for _ in r.horses]
-        fatigue = [random.uniform(0.01, 0.03) for _ in r.horses]
-        winners = set()
+        # Bound methods + zipped per-horse params keep the tick loop free of global/index lookups
+        rand, unif = r.rng.random, r.rng.uniform
+        idxs = range(len(r.horses))
+        stats = [(i, unif(2.6, 3.2), unif(0.10, 0.25), unif(0.01, 0.03)) for i in idxs]
+        pos = r.positions
+        crossed = bytearray(len(r.horses))  # 1 once a horse is in r.finished
+        finish_line, finished, track = TRACK_LEN, r.finished.append, self.track
+        first = None  # tick the first horse crossed; stored on r once the loop ends
+        remaining = len(r.horses)  # horses yet to cross; at 0 the full order is decided
+        # Bets are closed, so the pot (and this embed) can't change mid-race
+        embed = discord.Embed(title="🏁 Racing…", color=discord.Color.blurple()).add_field(name="Pot", value=fmt(r.pool()))
+        shown = r.msg.content if r.msg else None
+        # Ticks run on a fixed schedule from `start`, and frames are sent in the background:
+        # a slow edit no longer stretches the race, and at most one edit is on the wire
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        editing: Optional[asyncio.Task] = None
+        edited_at = float("-inf")
         for t in range(40):
-            for i in range(len(r.horses)):
-                v = base[i] * (1.0 - fatigue[i] * t)
-                if random.random() < burst[i]: v *= random.uniform(1.25, 1.6)
-                delta = max(0.2, v + random.uniform(-0.4, 0.6))
-                r.positions[i] += delta
-                if r.positions[i] >= TRACK_LEN and i not in winners:
-                    winners.add(i); r.finished.append(i)
-            try:
-                await r.msg.edit(content=self.track(r),
-                                 embed=discord.Embed(title="🏁 Racing…", color=discord.Color.blurple()).add_field(name="Pot", value=fmt(r.pool())))
-            except Exception:
-                pass
-            if r.finished and t >= 3 + r.finished.index(r.finished[0]): break
-            await asyncio.sleep(tick)
+            for i, base, burst, fatigue in stats:
+                v = base * (1.0 - fatigue * t)
+                if rand() < burst: v *= unif(1.25, 1.6)
+                delta = v + unif(-0.4, 0.6)
+                p = pos[i] = pos[i] + (delta if delta > 0.2 else 0.2)
+                if p >= finish_line and not crossed[i]:
+                    crossed[i] = 1; finished(i); remaining -= 1
+                    if first is None: first = t
+            frame = track(r)
+            # Bars are whole cells, so frames repeat once horses cap at the line. A frame that's ready
+            # while an edit is in flight, or inside the min gap (catch-up ticks after a stall run back
+            # to back), is superseded by the next one
+            now = loop.time()
+            if frame != shown and (editing is None or editing.done()) and now - edited_at >= RACE_FRAME_MIN_GAP:
+                editing = asyncio.create_task(self._edit_frame(r, frame, embed))
+                shown, edited_at = frame, now
+            if first is not None and (t >= first + 3 or not remaining): break
+            await asyncio.sleep(max(0.0, start + (t + 1) * tick - loop.time()))
+        r._first_finish_tick = first
+        if editing is not None:
+            await editing  # the results edit in finish() must land after the last frame
         if not r.finished:
             r.finished = sorted(range(len(r.horses)), key=lambda i: -r.positions[i])
 
+    @staticmethod
+    async def _edit_frame(r: Race, frame: str, embed: discord.Embed):
+        try:
+            await r.msg.edit(content=frame, embed=embed)
+        except Exception:
+            pass
+
+    async def _pay(self, guild_id: int, r: Race, rows: List[Tuple[int, int]],
+                   kind: str, reason: str, verb: str, **extra) -> List[str]:
+        """Credit (bet row, amount) pairs in one DB transaction and log each; returns results-embed lines.
+
+        If the batch fails nothing was credited, so each bet is retried on its own and whatever
+        still fails is logged with its (user, amount) for a manual fix.
+        """
+        user_ids = r.bet_user_ids
+        credits = [(user_ids[j], amount) for j, amount in rows]
+        failed: Dict[int, Exception] = {}
+        try:
+            balances = await self.add_cash_many(guild_id, credits, reason)
+        except Exception:
+            log.exception("Horse race %s batch failed (channel %s, seed %s); paying bets one by one: %s",
+                          kind, r.channel_id, r.seed, credits)
+            balances = {}
+            for j, amount in rows:
+                try:
+                    balances[user_ids[j]] = await self.add_cash(user_ids[j], guild_id, amount, reason)
+                except Exception as e:
+                    failed[j] = e
+            if failed:
+                log.error("Horse race %s credits NOT applied (channel %s, seed %s), fix by hand: %s",
+                          kind, r.channel_id, r.seed, [(user_ids[j], amount) for j, amount in rows if j in failed])
+        lines = []
+        for j, amount in rows:
+            user_id, horse = user_ids[j], r.bet_horses[j]
+            if j in failed:
+                lines.append(f"• <@{user_id}> {kind} error: {failed[j]}")
+                continue
+            await self.tx.write(kind, {"user_id": str(user_id), "username": r.bet_usernames[j],
+                                       "horse_idx": horse, "horse_name": r.horses[horse],
+                                       "amount": amount, "balance_after": balances.get(user_id), **extra})
+            lines.append(f"• <@{user_id}> {verb} **{fmt(amount)}**")
+        return lines
+
     async def finish(self, interaction: discord.Interaction, r: Race, payout: bool):
         r.ended = True
+        self.cancel_lobby_update(r)
         try:
             if r.lobby: await r.lobby.edit(view=None)
         except Exception:
@@ -412,44 +682,27 @@ class HorseRace(BaseCog):
             rake = math.floor(pot * r.rake_bps / 10000)
             prize = pot - rake
             win = r.finished[0]
-            winners = [b for b in r.bets if b.horse == win]
-            win_pool = sum(b.amount for b in winners)
+            amounts = r.bet_amounts
+            winners = [j for j, h in enumerate(r.bet_horses) if h == win]
+            win_pool = r.pool_for(win)
             if win_pool > 0 and prize > 0:
-                for b in winners:
-                    share = b.amount / win_pool
-                    pay = math.floor(prize * share)
-                    try:
-                        await self.add_cash(b.user_id, interaction.guild_id, pay, "Horse race winnings")
-                        new_balance = await self.get_user_balance(b.user_id, interaction.guild_id)
-                        lines.append(f"• <@{b.user_id}> wins **{fmt(pay)}**")
-                        await self.tx.write("payout", {"user_id": str(b.user_id), "username": b.username,
-                                                       "horse_idx": b.horse, "horse_name": r.horses[b.horse],
-                                                       "amount": pay, "balance_after": new_balance.cash,
-                                                       "pot": pot, "prize_pool": prize, "rake": rake,
-                                                       "winning_horse": r.horses[win]})
-                    except Exception as e:
-                        lines.append(f"• <@{b.user_id}> payout error: {e}")
+                lines = await self._pay(interaction.guild_id, r,
+                                        [(j, math.floor(prize * (amounts[j] / win_pool))) for j in winners],
+                                        "payout", "Horse race winnings", "wins",
+                                        pot=pot, prize_pool=prize, rake=rake, winning_horse=r.horses[win])
                 footer = f"House rake: **{fmt(rake)}**"
             else:
                 refund_pool = math.floor(pot * 0.90)
-                for b in r.bets:
-                    refund = math.floor(refund_pool * (b.amount / pot)) if pot else 0
-                    try:
-                        await self.add_cash(b.user_id, interaction.guild_id, refund, "Horse race refund")
-                        new_balance = await self.get_user_balance(b.user_id, interaction.guild_id)
-                        lines.append(f"• <@{b.user_id}> refunded **{fmt(refund)}**")
-                        await self.tx.write("refund", {"user_id": str(b.user_id), "username": b.username,
-                                                       "horse_idx": b.horse, "horse_name": r.horses[b.horse],
-                                                       "amount": refund, "balance_after": new_balance.cash,
-                                                       "pot": pot, "prize_pool": 0, "rake": rake,
-                                                       "winning_horse": r.horses[win]})
-                    except Exception as e:
-                        lines.append(f"• <@{b.user_id}> refund error: {e}")
+                lines = await self._pay(interaction.guild_id, r,
+                                        [(j, math.floor(refund_pool * (amounts[j] / pot)) if pot else 0)
+                                         for j in range(r.bet_count())],
+                                        "refund", "Horse race refund", "refunded",
+                                        pot=pot, prize_pool=0, rake=rake, winning_horse=r.horses[win])
                 footer = f"No winning bets — refunded 90% of pot. Burned **{(pot - refund_pool):,} CC**."
 
         embed = discord.Embed(title="🏆 Race Results", color=discord.Color.green())
         embed.add_field(name="Podium", value=results, inline=False)
-        if payout and r.bets:
+        if payout and r.bet_count():
             embed.add_field(name="Payouts", value="\n".join(lines) or "—", inline=False)
             if footer: embed.set_footer(text=footer)
         else:
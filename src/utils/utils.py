@@ -74,6 +74,7 @@ def render_hand(card_paths, out_path, *, show_all=True,
                 angle_step=4, overlap_px=45, scale=0.5, back_path=None):
     """
     card_paths: list of file paths (e.g. ['src/assets/cards/JS.png', 'src/assets/cards/7C.png'])
+    out_path:   PNG destination — a file path or a writable binary file object (e.g. io.BytesIO)
     show_all:   if False, only show first card + back (for dealer)
     back_path:  path to back.png (used when show_all=False)
     """
@@ -102,7 +103,7 @@ def render_hand(card_paths, out_path, *, show_all=True,
         canvas.alpha_composite(img, (x, y))
         x += overlap_px
 
-    canvas.save(out_path)
+    canvas.save(out_path, format="PNG")
     return out_path
 # COMMENTED OUT - Using unified database system instead of Unbelievaboat API
 # # Global UnbelievaBoat client